@@ -1,8 +1,10 @@
 
-from fastapi import APIRouter, HTTPException, Form
+import json
+from fastapi import APIRouter, HTTPException, Form, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List
 from models.student import StudentCreate, RecommendationResponse, StudentDetail
-from services.student_service import StudentService
+from services.student_service import DEFAULT_TOP_K, StudentService
 
 router = APIRouter(prefix="/api/v1", tags=["students"])
 student_service = StudentService()
@@ -31,7 +33,7 @@ async def onboard_student(
             stream=stream.lower() if stream else stream,
             interests=[i.lower() for i in interests] if interests else interests,
         )
-        student_id = student_service.save_student(student_obj)
+        student_id = await student_service.save_student(student_obj)
         return {
             "message": "Student onboarded successfully",
             "student_id": student_id
@@ -40,10 +42,40 @@ async def onboard_student(
         raise HTTPException(status_code=500, detail=f"Error onboarding student: {str(e)}")
 
 
+@router.post("/onboard/bulk", response_model=dict)
+async def onboard_students(students: List[StudentCreate]):
+    """
+    Onboard a batch of students in one write transaction.
+    All fields (including name) are stored as lowercase, as with /onboard.
+    """
+    try:
+        student_objs = [
+            StudentCreate(
+                name=s.name.lower(),
+                address=s.address.lower(),
+                college=s.college.lower(),
+                board=s.board.lower(),
+                stream=s.stream.lower(),
+                interests=[i.lower() for i in s.interests],
+            )
+            for s in students
+        ]
+        student_ids = await student_service.save_students(student_objs)
+        return {
+            "message": f"{len(student_ids)} students onboarded successfully",
+            "student_ids": student_ids
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error onboarding students: {str(e)}")
+
+
 @router.get("/recommend/people/{student_id}", response_model=RecommendationResponse)
-async def recommend_people(student_id: int):
+async def recommend_people(student_id: int, top_k: int = Query(DEFAULT_TOP_K, ge=1, le=500)):
+    """
+    Recommend up to top_k students for a student, best match first.
+    """
     try:
-        recommendations = student_service.recommend_people(student_id)
+        recommendations = await student_service.recommend_people(student_id, top_k)
         
         if not recommendations:
             message = "Sorry, no matches found for this platform."
@@ -54,19 +86,48 @@ async def recommend_people(student_id: int):
             elif len(names) == 2:
                 message = f"{names[0]} and {names[1]} are also in this platform."
             else:
-                all_but_last = ", ".join(names[:-1])
-                last_name = names[-1]
-                message = f"{all_but_last}, and {last_name} are also in this platform."
+                # One join over all names; the last ", " is where "and" goes.
+                joined = ", ".join(names)
+                cut = len(joined) - len(names[-1])
+                message = f"{joined[:cut]}and {joined[cut:]} are also in this platform."
         
-        return RecommendationResponse(
+        # The recommendations come straight from our own query, so skip FastAPI's
+        # response_model revalidation and serialize once with pydantic-core.
+        payload = RecommendationResponse.model_construct(
             students=recommendations,
             message=message,
             total_matches=len(recommendations)
         )
+        return Response(content=payload.model_dump_json(), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting recommendations: {str(e)}")
 
 
+@router.get("/recommend/people/{student_id}/stream")
+async def stream_recommend_people(student_id: int, top_k: int = Query(500, ge=1, le=5000)):
+    """
+    Stream up to top_k recommendations as NDJSON, one StudentResponse per line, best match first.
+    Meant for large neighbourhoods; there is no message or total_matches.
+    If the database fails mid-stream, the last line is {"error": "..."}.
+    """
+    try:
+        if not await student_service.student_exists(student_id):
+            raise HTTPException(status_code=404, detail="Student not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting recommendations: {str(e)}")
+
+    async def _lines():
+        try:
+            async for rec in student_service.stream_recommendations(student_id, top_k):
+                yield rec.model_dump_json() + "\n"
+        except Exception as e:
+            # The 200 status is already sent, so report the failure in-band
+            yield json.dumps({"error": f"Error getting recommendations: {str(e)}"}) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
 
 @router.get("/students/{student_id}", response_model=StudentDetail)
 async def get_student(student_id: int):
@@ -74,7 +135,7 @@ async def get_student(student_id: int):
     Get a single student's full details by id.
     """
     try:
-        student = student_service.get_student_by_id(student_id)
+        student = await student_service.get_student_by_id(student_id)
         if not student:
             raise HTTPException(status_code=404, detail="Student not found")
         return student
@@ -87,7 +148,7 @@ async def get_student(student_id: int):
 @router.get("/db-check", response_model=dict)
 async def db_check():
     try:
-        ok = student_service.ping()
+        ok = await student_service.ping()
         return {"db_connected": ok}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB check failed: {str(e)}")
@@ -1,109 +1,182 @@
 import sys
 import os
 import argparse
+from collections import defaultdict
+from itertools import combinations
 
 # ensure src is on path to import graphdb
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
 from graphdb import Neo4jConnection
 
 
+# Each equality relationship groups students by the normalised value first and only
+# pairs students within a group, so the work is the sum of |group|^2 instead of N^2.
+SAME_COLLEGE_QUERY = """
+MATCH (a:Student)
+WHERE a.college IS NOT NULL AND trim(a.college) <> ''
+WITH toLower(trim(a.college)) AS k, collect(a) AS students
+WHERE size(students) > 1
+UNWIND students AS a
+UNWIND students AS b
+WITH a, b
+WHERE a.id < b.id
+MERGE (a)-[:SAME_COLLEGE]->(b)
+"""
+
+SAME_BOARD_QUERY = """
+MATCH (a:Student)
+WHERE a.board IS NOT NULL AND trim(a.board) <> ''
+WITH toLower(trim(a.board)) AS k, collect(a) AS students
+WHERE size(students) > 1
+UNWIND students AS a
+UNWIND students AS b
+WITH a, b
+WHERE a.id < b.id
+MERGE (a)-[:SAME_BOARD]->(b)
+"""
+
+SAME_STREAM_QUERY = """
+MATCH (a:Student)
+WHERE a.stream IS NOT NULL AND trim(a.stream) <> ''
+WITH toLower(trim(a.stream)) AS k, collect(a) AS students
+WHERE size(students) > 1
+UNWIND students AS a
+UNWIND students AS b
+WITH a, b
+WHERE a.id < b.id
+MERGE (a)-[:SAME_STREAM]->(b)
+"""
+
+NEARBY_QUERY = """
+MATCH (a:Student)
+WHERE a.address IS NOT NULL AND trim(a.address) <> ''
+WITH toLower(trim(a.address)) AS k, collect(a) AS students
+WHERE size(students) > 1
+UNWIND students AS a
+UNWIND students AS b
+WITH a, b
+WHERE a.id < b.id
+MERGE (a)-[:NEARBY]->(b)
+"""
+
+# Interest overlap is found client-side from an inverted index (see
+# _shared_interest_pairs) and written back in batches of id pairs. Recommendations
+# score interests through (:Student)-[:LIKES]->(:Interest) and don't read these
+# edges, so they are only built on request (--interest).
+STUDENT_INTERESTS_QUERY = """
+MATCH (s:Student)
+WHERE s.id IS NOT NULL AND s.interests IS NOT NULL
+RETURN s.id AS id, s.interests AS interests
+"""
+
+SHARES_INTEREST_QUERY = """
+UNWIND $pairs AS p
+MATCH (a:Student {id: p.a})
+MATCH (b:Student {id: p.b})
+MERGE (a)-[r:SHARES_INTEREST]->(b)
+SET r.common = p.common
+"""
+
+PAIR_BATCH_SIZE = 10000
+
+
 def _connect():
     conn = Neo4jConnection()
     conn.connect()
     return conn
 
 
-def create_same_college():
-    q = """
-    MATCH (a:Student), (b:Student)
-    WHERE a.id < b.id
-      AND a.college IS NOT NULL
-      AND toLower(trim(a.college)) = toLower(trim(b.college))
-    MERGE (a)-[:SAME_COLLEGE]->(b)
+def _normalize(value):
+    return value.strip().lower()
+
+
+def _shared_interest_pairs(rows):
     """
-    conn = _connect()
-    try:
-        with conn.driver.session(database=conn.database) as session:
-            session.run(q)
-    finally:
-        conn.close()
+    Build {interest -> student ids} from (id, interests) rows and return every pair
+    (a.id < b.id) sharing at least one interest, with a's matching interests as `common`.
+    """
+    interests = {row["id"]: [x for x in row["interests"] if x is not None] for row in rows}
+    normalized = {sid: {_normalize(x) for x in values} for sid, values in interests.items()}
 
+    index = defaultdict(set)
+    for sid, values in normalized.items():
+        for value in values:
+            index[value].add(sid)
 
-def create_same_board():
-    q = """
-    MATCH (a:Student), (b:Student)
-    WHERE a.id < b.id
-      AND a.board IS NOT NULL
-      AND toLower(trim(a.board)) = toLower(trim(b.board))
-    MERGE (a)-[:SAME_BOARD]->(b)
+    pairs = set()
+    for ids in index.values():
+        if len(ids) > 1:
+            pairs.update(combinations(sorted(ids), 2))
+
+    return [
+        {"a": a, "b": b, "common": [x for x in interests[a] if _normalize(x) in normalized[b]]}
+        for a, b in sorted(pairs)
+    ]
+
+
+def _merge_shared_interests(tx):
+    rows = tx.run(STUDENT_INTERESTS_QUERY).data()
+    pairs = _shared_interest_pairs(rows)
+    for i in range(0, len(pairs), PAIR_BATCH_SIZE):
+        tx.run(SHARES_INTEREST_QUERY, pairs=pairs[i:i + PAIR_BATCH_SIZE]).consume()
+
+
+def _run_queries(queries):
     """
+    Run the given relationship steps over one connection, in one write transaction.
+    A step is either a Cypher string or a function taking the transaction.
+    """
+    if not queries:
+        return
+
+    def _work(tx):
+        for q in queries:
+            if callable(q):
+                q(tx)
+            else:
+                tx.run(q).consume()
+
     conn = _connect()
     try:
         with conn.driver.session(database=conn.database) as session:
-            session.run(q)
+            session.execute_write(_work)
     finally:
         conn.close()
 
 
+def create_same_college():
+    _run_queries([SAME_COLLEGE_QUERY])
+
+
+def create_same_board():
+    _run_queries([SAME_BOARD_QUERY])
+
+
 def create_same_stream():
-    q = """
-    MATCH (a:Student), (b:Student)
-    WHERE a.id < b.id
-      AND a.stream IS NOT NULL
-      AND toLower(trim(a.stream)) = toLower(trim(b.stream))
-    MERGE (a)-[:SAME_STREAM]->(b)
-    """
-    conn = _connect()
-    try:
-        with conn.driver.session(database=conn.database) as session:
-            session.run(q)
-    finally:
-        conn.close()
+    _run_queries([SAME_STREAM_QUERY])
 
 
 def create_nearby():
-    q = """
-    MATCH (a:Student), (b:Student)
-    WHERE a.id < b.id
-      AND a.address IS NOT NULL
-      AND toLower(trim(a.address)) = toLower(trim(b.address))
-    MERGE (a)-[:NEARBY]->(b)
-    """
-    conn = _connect()
-    try:
-        with conn.driver.session(database=conn.database) as session:
-            session.run(q)
-    finally:
-        conn.close()
+    _run_queries([NEARBY_QUERY])
 
 
 def create_shares_interest():
-    q = """
-    MATCH (a:Student), (b:Student)
-    WHERE a.id < b.id
-      AND any(x IN a.interests WHERE any(y IN b.interests WHERE toLower(trim(x)) = toLower(trim(y))))
-    MERGE (a)-[r:SHARES_INTEREST]->(b)
-    SET r.common = [x IN a.interests WHERE any(y IN b.interests WHERE toLower(trim(x)) = toLower(trim(y)))]
-    """
-    conn = _connect()
-    try:
-        with conn.driver.session(database=conn.database) as session:
-            session.run(q)
-    finally:
-        conn.close()
+    _run_queries([_merge_shared_interests])
 
 
-def run_all(create_board=True, create_college=True, create_stream=True, create_address=True, create_interest=True):
+def run_all(create_board=True, create_college=True, create_stream=True, create_address=True, create_interest=False):
+    queries = []
     if create_college:
-        create_same_college()
+        queries.append(SAME_COLLEGE_QUERY)
     if create_board:
-        create_same_board()
+        queries.append(SAME_BOARD_QUERY)
     if create_stream:
-        create_same_stream()
+        queries.append(SAME_STREAM_QUERY)
     if create_address:
-        create_nearby()
+        queries.append(NEARBY_QUERY)
     if create_interest:
-        create_shares_interest()
+        queries.append(_merge_shared_interests)
+    _run_queries(queries)
 
 
 def _cli():
@@ -112,7 +185,8 @@ def _cli():
     parser.add_argument('--no-college', action='store_true', help='Skip creating SAME_COLLEGE relationships')
     parser.add_argument('--no-stream', action='store_true', help='Skip creating SAME_STREAM relationships')
     parser.add_argument('--no-address', action='store_true', help='Skip creating NEARBY relationships')
-    parser.add_argument('--no-interest', action='store_true', help='Skip creating SHARES_INTEREST relationships')
+    parser.add_argument('--interest', action='store_true', help='Also create SHARES_INTEREST relationships (not used by recommendations)')
+    parser.add_argument('--no-interest', action='store_true', help='Deprecated: SHARES_INTEREST is skipped by default; kept as a no-op')
     args = parser.parse_args()
 
     run_all(
@@ -120,7 +194,7 @@ def _cli():
         create_college=not args.no_college,
         create_stream=not args.no_stream,
         create_address=not args.no_address,
-        create_interest=not args.no_interest,
+        create_interest=args.interest,
     )
 
 
@@ -1,225 +1,460 @@
 import sys
 import os
+import re
 # Add src directory to path to import graphdb
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
 
-from graphdb import Neo4jConnection
-from typing import List, Optional
+from graphdb import AsyncNeo4jConnection
+from neo4j import READ_ACCESS, RoutingControl
+from typing import AsyncIterator, List, Optional
 from models.student import StudentCreate, StudentResponse, StudentDetail
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+from cachetools import TTLCache
+
+
+# Cypher is kept in module-level constants and every value is passed as a
+# parameter, so each statement has one fixed text and Neo4j reuses its plan.
+
+SCHEMA_STATEMENTS = (
+    "CREATE CONSTRAINT student_id IF NOT EXISTS FOR (s:Student) REQUIRE s.id IS UNIQUE",
+    "CREATE CONSTRAINT counter_name IF NOT EXISTS FOR (c:Counter) REQUIRE c.name IS UNIQUE",
+    "CREATE INDEX student_college IF NOT EXISTS FOR (s:Student) ON (s.college)",
+    "CREATE INDEX student_board IF NOT EXISTS FOR (s:Student) ON (s.board)",
+    "CREATE INDEX student_stream IF NOT EXISTS FOR (s:Student) ON (s.stream)",
+    "CREATE INDEX student_address IF NOT EXISTS FOR (s:Student) ON (s.address)",
+    "CREATE INDEX student_college_norm IF NOT EXISTS FOR (s:Student) ON (s.college_norm)",
+    "CREATE INDEX student_board_norm IF NOT EXISTS FOR (s:Student) ON (s.board_norm)",
+    "CREATE INDEX student_stream_norm IF NOT EXISTS FOR (s:Student) ON (s.stream_norm)",
+    "CREATE INDEX student_address_norm IF NOT EXISTS FOR (s:Student) ON (s.address_norm)",
+    "CREATE CONSTRAINT interest_name_norm IF NOT EXISTS FOR (i:Interest) REQUIRE i.name_norm IS UNIQUE",
+    "CREATE FULLTEXT INDEX student_name_ft IF NOT EXISTS FOR (s:Student) ON EACH [s.name]",
+)
+
+SEED_STUDENT_COUNTER_QUERY = """
+MATCH (s:Student)
+WITH coalesce(MAX(s.id), 0) AS max_id
+MERGE (c:Counter {name: 'student'})
+ON CREATE SET c.value = max_id
+"""
+
+BACKFILL_NORMALIZED_QUERY = """
+MATCH (s:Student)
+WHERE s.board_norm IS NULL OR s.stream_norm IS NULL OR s.college_norm IS NULL
+   OR s.address_norm IS NULL OR s.interests_norm IS NULL
+SET s.board_norm     = toLower(trim(coalesce(s.board, ''))),
+    s.stream_norm    = toLower(trim(coalesce(s.stream, ''))),
+    s.college_norm   = toLower(trim(coalesce(s.college, ''))),
+    s.address_norm   = toLower(trim(coalesce(s.address, ''))),
+    s.interests_norm = [x IN coalesce(s.interests, []) | toLower(trim(x))]
+RETURN count(s) AS processed
+"""
+
+# Interests are shared (:Interest {name_norm}) nodes, so interest overlap is a
+# two-hop traversal instead of a comparison of every pair of interest lists.
+BACKFILL_INTERESTS_QUERY = """
+MATCH (s:Student)
+WHERE any(n IN coalesce(s.interests_norm, []) WHERE n <> '') AND NOT (s)-[:LIKES]->(:Interest)
+FOREACH (n IN [n IN s.interests_norm WHERE n <> ''] |
+    MERGE (i:Interest {name_norm: n})
+    MERGE (s)-[:LIKES]->(i))
+RETURN count(s) AS processed
+"""
+
+# Increment in place so the counter is read under the SET's write lock; reading it
+# first (WITH c.value AS base) lets concurrent transactions reserve the same ids.
+RESERVE_STUDENT_IDS_QUERY = """
+MERGE (c:Counter {name: 'student'})
+ON CREATE SET c.value = 0
+SET c.value = c.value + $count
+RETURN c.value - $count AS base
+"""
+
+CREATE_STUDENTS_QUERY = """
+UNWIND $rows AS r
+CREATE (s:Student)
+SET s = r
+FOREACH (n IN [n IN s.interests_norm WHERE n <> ''] |
+    MERGE (i:Interest {name_norm: n})
+    MERGE (s)-[:LIKES]->(i))
+"""
+
+# Links each new student in one statement. Every attribute is a separate subquery
+# that seeks the matching students through the *_norm index instead of scanning
+# all students and filtering. Within a batch, each student only links to the ones
+# created before it, as if they had been saved one at a time. Shared interests
+# need no edge here; they meet at the Interest nodes.
+LINK_NEW_STUDENTS_QUERY = """
+UNWIND $ids AS id
+MATCH (s:Student {id: id})
+CALL {
+    WITH s, id
+    MATCH (o:Student {college_norm: s.college_norm})
+    WHERE s.college_norm <> '' AND o.id <> id AND NOT (o.id IN $ids AND o.id > id)
+    MERGE (s)-[:SAME_COLLEGE]->(o)
+}
+CALL {
+    WITH s, id
+    MATCH (o:Student {board_norm: s.board_norm})
+    WHERE s.board_norm <> '' AND o.id <> id AND NOT (o.id IN $ids AND o.id > id)
+    MERGE (s)-[:SAME_BOARD]->(o)
+}
+CALL {
+    WITH s, id
+    MATCH (o:Student {stream_norm: s.stream_norm})
+    WHERE s.stream_norm <> '' AND o.id <> id AND NOT (o.id IN $ids AND o.id > id)
+    MERGE (s)-[:SAME_STREAM]->(o)
+}
+CALL {
+    WITH s, id
+    MATCH (o:Student {address_norm: s.address_norm})
+    WHERE s.address_norm <> '' AND o.id <> id AND NOT (o.id IN $ids AND o.id > id)
+    MERGE (s)-[:NEARBY]->(o)
+}
+"""
+
+GET_STUDENT_QUERY = """
+MATCH (s:Student {id: $student_id})
+RETURN s.id as id, s.name as name, s.address as address,
+       s.college as college, s.board as board, s.stream as stream,
+       s.interests as interests
+"""
+
+STUDENT_EXISTS_QUERY = "MATCH (s:Student {id: $student_id}) RETURN s.id AS id"
+
+# Expand only along the relationships save_student/create_relationships
+# already maintain and the student's Interest nodes, so the work is O(degree)
+# rather than O(|Student|).
+RECOMMEND_QUERY = """
+MATCH (s:Student {id: $student_id})
+CALL {
+    WITH s
+    MATCH (s)-[r:SAME_BOARD|SAME_STREAM|SAME_COLLEGE|NEARBY]-(o:Student)
+    RETURN o, type(r) AS t, null AS interest
+    UNION
+    WITH s
+    MATCH (s)-[:LIKES]->(i:Interest)<-[:LIKES]-(o:Student)
+    RETURN o, null AS t, i.name_norm AS interest
+}
+WITH o, collect(DISTINCT t) AS types, collect(DISTINCT interest) AS matching_interests
+WHERE o.id <> $student_id
+WITH o,
+  (CASE WHEN 'SAME_BOARD' IN types THEN 1 ELSE 0 END) AS bm,
+  (CASE WHEN 'SAME_STREAM' IN types THEN 1 ELSE 0 END) AS sm,
+  (CASE WHEN 'SAME_COLLEGE' IN types THEN 1 ELSE 0 END) AS cm,
+  (CASE WHEN 'NEARBY' IN types THEN 1 ELSE 0 END) AS am,
+  matching_interests
+WITH o, bm, sm, cm, am, matching_interests, (bm + sm + cm + am + size(matching_interests)) AS score
+WHERE score > 0
+RETURN o.id AS id, o.name AS name, o.address AS address,
+       bm * 16 + sm * 8 + cm * 4 + am * 2 + CASE WHEN size(matching_interests) > 0 THEN 1 ELSE 0 END AS mask,
+       CASE WHEN size(matching_interests) > 0 THEN matching_interests END AS matching_interests
+ORDER BY score DESC
+LIMIT $top_k
+"""
+
+# Fallback for graphs whose relationship edges have not been created yet.
+# Blank values never count as a match, as in LINK_NEW_STUDENTS_QUERY.
+RECOMMEND_FALLBACK_QUERY = """
+MATCH (s:Student {id: $student_id})
+MATCH (o:Student)
+WHERE o.id <> $student_id
+WITH s, o,
+  (CASE WHEN s.board_norm <> '' AND o.board_norm = s.board_norm THEN 1 ELSE 0 END) AS bm,
+  (CASE WHEN s.stream_norm <> '' AND o.stream_norm = s.stream_norm THEN 1 ELSE 0 END) AS sm,
+  (CASE WHEN s.college_norm <> '' AND o.college_norm = s.college_norm THEN 1 ELSE 0 END) AS cm,
+  (CASE WHEN s.address_norm <> '' AND o.address_norm = s.address_norm THEN 1 ELSE 0 END) AS am,
+  [x IN o.interests_norm WHERE x <> '' AND x IN s.interests_norm] AS matching_interests
+WITH o, bm, sm, cm, am, matching_interests, (bm + sm + cm + am + size(matching_interests)) AS score
+WHERE score > 0
+RETURN o.id AS id, o.name AS name, o.address AS address,
+       bm * 16 + sm * 8 + cm * 4 + am * 2 + CASE WHEN size(matching_interests) > 0 THEN 1 ELSE 0 END AS mask,
+       CASE WHEN size(matching_interests) > 0 THEN matching_interests END AS matching_interests
+ORDER BY score DESC
+LIMIT $top_k
+"""
+
+# Decodes the recommend queries' match mask (board, stream, college, address,
+# interests from high bit to low) into StudentResponse.matched_on.
+_MATCH_FIELDS = ("board", "stream", "college", "address", "interests")
+_MASK_TO_FIELDS = tuple(
+    tuple(f for i, f in enumerate(_MATCH_FIELDS) if mask >> (len(_MATCH_FIELDS) - 1 - i) & 1)
+    for mask in range(1 << len(_MATCH_FIELDS))
+)
+_ADDRESS_BIT = 2
+
+DEFAULT_TOP_K = 50
+
+PING_QUERY = "RETURN 1"
+
+LOWERCASE_STUDENTS_QUERY = """
+MATCH (s:Student)
+SET s.name    = CASE WHEN s.name    IS NULL THEN NULL ELSE toLower(s.name)    END,
+    s.address = CASE WHEN s.address IS NULL THEN NULL ELSE toLower(s.address) END,
+    s.college = CASE WHEN s.college IS NULL THEN NULL ELSE toLower(s.college) END,
+    s.board   = CASE WHEN s.board   IS NULL THEN NULL ELSE toLower(s.board)   END,
+    s.stream  = CASE WHEN s.stream  IS NULL THEN NULL ELSE toLower(s.stream)  END,
+    s.interests = [x IN coalesce(s.interests, []) | toLower(x)]
+RETURN count(s) AS processed
+"""
+
+# Lucene does the fuzzy candidate search server-side; only the best-scoring
+# candidates come back to be re-ranked with rapidfuzz.
+FUZZY_NAME_CANDIDATES_QUERY = """
+CALL db.index.fulltext.queryNodes('student_name_ft', $q) YIELD node AS s
+RETURN s.id as id, s.name as name, s.address as address,
+       s.college as college, s.board as board, s.stream as stream,
+       s.interests as interests
+LIMIT $candidates
+"""
+
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+_FUZZY_CANDIDATES_PER_RESULT = 5
+
+
+# Recommendations only change when students are written, so results are cached per
+# (student_id, graph version). Writes bump the version, which orphans stale entries;
+# out-of-process writers (e.g. the startup backfill) call invalidate_recommendations()
+# when they finish, and the TTL covers any others.
+_rec_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+_graph_version = 0
+
+
+def _bump_graph_version() -> None:
+    global _graph_version
+    _graph_version += 1
+
+
+def _norm(value: Optional[str]) -> str:
+    """Lowercase/trim a field the same way the matching queries compare it."""
+    return (value or "").strip().lower()
+
+
+def _student_props(student: StudentCreate) -> dict:
+    """Node properties for a new student, including the *_norm matching fields."""
+    interests = student.interests or []
+    return {
+        "name": student.name,
+        "address": student.address,
+        "college": student.college,
+        "board": student.board,
+        "stream": student.stream,
+        "interests": interests,
+        "address_norm": _norm(student.address),
+        "college_norm": _norm(student.college),
+        "board_norm": _norm(student.board),
+        "stream_norm": _norm(student.stream),
+        "interests_norm": [_norm(i) for i in interests],
+    }
+
+
+def _fuzzy_lucene_query(text: str) -> str:
+    """Turn free text into a Lucene query that fuzzy-matches every term, e.g. 'rebant~'."""
+    return " ".join(_LUCENE_SPECIAL.sub(r"\\\1", term) + "~" for term in text.split())
+
+
+def _recommendation(row) -> StudentResponse:
+    # Rows are positional (id, name, address, mask, matching_interests), as the
+    # recommend queries return them. They come from our own query, so the
+    # responses are constructed without re-running validation.
+    student_id, name, address, mask, matching_interests = row
+    return StudentResponse.model_construct(
+        id=student_id,
+        name=name,
+        address=address,
+        matched_on=list(_MASK_TO_FIELDS[mask]),
+        matching_interests=matching_interests,
+        same_address=bool(mask & _ADDRESS_BIT),
+    )
+
+
+# Transaction functions for session.execute_read / execute_write.
+
+async def _single(tx, query: str, **params):
+    result = await tx.run(query, params)
+    return await result.single()
+
+
+async def _values(tx, query: str, **params) -> List[list]:
+    result = await tx.run(query, params)
+    return await result.values()
+
+
+async def _consume(tx, query: str, **params) -> None:
+    result = await tx.run(query, params)
+    await result.consume()
 
 
 class StudentService:
     def __init__(self):
-        self.db = Neo4jConnection()
+        self.db = AsyncNeo4jConnection()
         self.db.connect()
 
-    def __del__(self):
-        if hasattr(self, 'db'):
-            self.db.close()
+    async def close(self) -> None:
+        await self.db.close()
+
+    def invalidate_recommendations(self) -> None:
+        """Drop cached recommendations after relationships were written elsewhere."""
+        _bump_graph_version()
 
-    def save_student(self, student: StudentCreate) -> int:
+    async def _read_single(self, query: str, **params):
         """
-        Save a student to Neo4j.
-        Returns the auto-incremented student id.
+        Run a small read with the driver-level execute_query, which buffers the
+        result eagerly and hands the connection straight back to the pool.
         """
-        name = student.name
-        address = student.address
-        college = student.college
-        board = student.board
-        stream = student.stream
-        interests = student.interests or []
-
-        with self.db.driver.session(database=self.db.database) as session:
-            result = session.run(
-                "MATCH (s:Student) RETURN MAX(s.id) as max_id"
-            )
-            record = result.single()
-            next_id = (record["max_id"] or 0) + 1
-
-            session.run(
-                """
-                CREATE (s:Student {
-                    id: $id,
-                    name: $name,
-                    address: $address,
-                    college: $college,
-                    board: $board,
-                    stream: $stream,
-                    interests: $interests
-                })
-                RETURN s.id as id
-                """,
-                id=next_id,
-                name=name,
-                address=address,
-                college=college,
-                board=board,
-                stream=stream,
-                interests=interests
-            )
+        records, _, _ = await self.db.driver.execute_query(
+            query, params, database_=self.db.database, routing_=RoutingControl.READ
+        )
+        return records[0] if records else None
 
-            session.run(
-                """
-                MATCH (s:Student {id: $id}), (o:Student)
-                WHERE o.id <> $id AND s.college IS NOT NULL AND s.college = o.college
-                MERGE (s)-[:SAME_COLLEGE]->(o)
-                """,
-                id=next_id
-            )
+    async def ensure_schema(self) -> None:
+        """
+        Create the Student id constraint and attribute indexes, and seed the id counter.
+        The counter starts at the current max id so existing students keep theirs.
+        """
+        async with self.db.driver.session(database=self.db.database) as session:
+            for statement in SCHEMA_STATEMENTS:
+                await session.execute_write(_consume, statement)
+            await session.execute_write(_consume, SEED_STUDENT_COUNTER_QUERY)
+        await self.backfill_normalized_fields()
+        await self.backfill_interest_nodes()
 
-            session.run(
-                """
-                MATCH (s:Student {id: $id}), (o:Student)
-                WHERE o.id <> $id AND s.board IS NOT NULL AND s.board = o.board
-                MERGE (s)-[:SAME_BOARD]->(o)
-                """,
-                id=next_id
-            )
+    async def backfill_normalized_fields(self) -> int:
+        """
+        Materialize the *_norm matching properties on students saved before they existed.
+        Returns the number of student nodes updated.
+        """
+        async with self.db.driver.session(database=self.db.database) as session:
+            rec = await session.execute_write(_single, BACKFILL_NORMALIZED_QUERY)
+        _bump_graph_version()
+        return rec["processed"] if rec else 0
 
-            session.run(
-                """
-                MATCH (s:Student {id: $id}), (o:Student)
-                WHERE o.id <> $id AND s.stream IS NOT NULL AND s.stream = o.stream
-                MERGE (s)-[:SAME_STREAM]->(o)
-                """,
-                id=next_id
-            )
+    async def backfill_interest_nodes(self) -> int:
+        """
+        Link students saved before Interest nodes existed to their interests.
+        Returns the number of student nodes updated.
+        """
+        async with self.db.driver.session(database=self.db.database) as session:
+            rec = await session.execute_write(_single, BACKFILL_INTERESTS_QUERY)
+        _bump_graph_version()
+        return rec["processed"] if rec else 0
 
-            session.run(
-                """
-                MATCH (s:Student {id: $id}), (o:Student)
-                WHERE o.id <> $id AND s.address IS NOT NULL AND s.address = o.address
-                MERGE (s)-[:NEARBY]->(o)
-                """,
-                id=next_id
-            )
+    async def save_student(self, student: StudentCreate) -> int:
+        """
+        Save a student to Neo4j.
+        Returns the auto-incremented student id. The id comes from save_students'
+        in-place counter increment, so concurrent onboards never share an id.
+        """
+        ids = await self.save_students([student])
+        return ids[0]
 
-            session.run(
-                """
-                MATCH (s:Student {id: $id}), (o:Student)
-                WHERE o.id <> $id AND any(x IN s.interests WHERE x IN o.interests)
-                MERGE (s)-[r:SHARES_INTEREST]->(o)
-                SET r.common = [x IN s.interests WHERE x IN o.interests]
-                """,
-                id=next_id
-            )
+    async def save_students(self, students: List[StudentCreate]) -> List[int]:
+        """
+        Save a batch of students to Neo4j in a single write transaction.
+        Ids are reserved with one counter update and the nodes are created with one UNWIND.
+        Returns the new student ids, in input order.
+        """
+        if not students:
+            return []
 
-        return next_id
-
-    def get_student_by_id(self, student_id: int) -> Optional[StudentDetail]:
-        with self.db.driver.session(database=self.db.database) as session:
-            result = session.run(
-                """
-                MATCH (s:Student {id: $student_id})
-                RETURN s.id as id, s.name as name, s.address as address,
-                       s.college as college, s.board as board, s.stream as stream,
-                       s.interests as interests
-                """,
-                student_id=student_id
-            )
-            record = result.single()
-            if not record:
-                return None
-            return StudentDetail(
-                id=record["id"],
-                name=record["name"],
-                address=record.get("address"),
-                college=record.get("college"),
-                board=record.get("board"),
-                stream=record.get("stream"),
-                interests=record.get("interests") or [],
-            )
+        async def _save(tx) -> List[int]:
+            record = await _single(tx, RESERVE_STUDENT_IDS_QUERY, count=len(students))
+            base = record["base"]
+            rows = [{"id": base + i + 1, **_student_props(student)} for i, student in enumerate(students)]
+            await _consume(tx, CREATE_STUDENTS_QUERY, rows=rows)
+
+            ids = [row["id"] for row in rows]
+            await _consume(tx, LINK_NEW_STUDENTS_QUERY, ids=ids)
+            return ids
 
-    def recommend_people(self, student_id: int) -> List[StudentResponse]:
+        async with self.db.driver.session(database=self.db.database) as session:
+            ids = await session.execute_write(_save)
+        _bump_graph_version()
+        return ids
+
+    async def get_student_by_id(self, student_id: int) -> Optional[StudentDetail]:
+        record = await self._read_single(GET_STUDENT_QUERY, student_id=student_id)
+        if not record:
+            return None
+        return StudentDetail(
+            id=record["id"],
+            name=record["name"],
+            address=record.get("address"),
+            college=record.get("college"),
+            board=record.get("board"),
+            stream=record.get("stream"),
+            interests=record.get("interests") or [],
+        )
+
+    async def recommend_people(self, student_id: int, top_k: int = DEFAULT_TOP_K) -> List[StudentResponse]:
         """
         Recommend students based on OR logic - case/space-insensitive comparisons.
+        Uses the student's relationship edges, or scores every student if it has none.
+        Returns at most top_k students, best match first.
         """
-        with self.db.driver.session(database=self.db.database) as session:
-            exists = session.run(
-                "MATCH (s:Student {id: $student_id}) RETURN s.id AS id",
-                student_id=student_id,
-            ).single()
-            if not exists:
-                return []
-
-            q = """
-            MATCH (s:Student {id: $student_id})
-            MATCH (o:Student)
-            WHERE o.id <> $student_id
-            WITH s, o,
-              (CASE WHEN toLower(trim(coalesce(o.board, ''))) = toLower(trim(coalesce(s.board, ''))) THEN 1 ELSE 0 END) AS bm,
-              (CASE WHEN toLower(trim(coalesce(o.stream, ''))) = toLower(trim(coalesce(s.stream, ''))) THEN 1 ELSE 0 END) AS sm,
-              (CASE WHEN toLower(trim(coalesce(o.college, ''))) = toLower(trim(coalesce(s.college, ''))) THEN 1 ELSE 0 END) AS cm,
-              (CASE WHEN toLower(trim(coalesce(o.address, ''))) = toLower(trim(coalesce(s.address, ''))) THEN 1 ELSE 0 END) AS am,
-              [x IN coalesce(o.interests, []) WHERE any(y IN coalesce(s.interests, []) WHERE toLower(trim(x)) = toLower(trim(y)))] AS matching_interests
-            WITH o, bm, sm, cm, am, matching_interests, (bm + sm + cm + am + size(matching_interests)) AS score
-            WHERE score > 0
-            RETURN o.id AS id, o.name AS name, o.address AS address, o.interests AS interests,
-                   bm AS board_match, sm AS stream_match, cm AS college_match, am AS address_match,
-                   matching_interests AS matching_interests, score
-            ORDER BY score DESC
-            """
-
-            result = session.run(q, student_id=student_id)
-            recommendations: List[StudentResponse] = []
-            for rec in result:
-                matched_fields = []
-                if rec["board_match"]:
-                    matched_fields.append("board")
-                if rec["stream_match"]:
-                    matched_fields.append("stream")
-                if rec["college_match"]:
-                    matched_fields.append("college")
-                if rec["address_match"]:
-                    matched_fields.append("address")
-
-                matching_interests = rec.get("matching_interests") or []
-                if matching_interests:
-                    matched_fields.append("interests")
-
-                recommendations.append(StudentResponse(
-                    id=rec["id"],
-                    name=rec["name"],
-                    address=rec.get("address"),
-                    matched_on=matched_fields,
-                    matching_interests=matching_interests if matching_interests else None,
-                    same_address=bool(rec.get("address_match")),
-                ))
-
-            return recommendations
-
-    def ping(self) -> bool:
+        cache_key = (student_id, top_k, _graph_version)
+        cached = _rec_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        if not await self._read_single(STUDENT_EXISTS_QUERY, student_id=student_id):
+            return []
+
+        async with self.db.driver.session(database=self.db.database) as session:
+            rows = await session.execute_read(_values, RECOMMEND_QUERY, student_id=student_id, top_k=top_k)
+            if not rows:
+                rows = await session.execute_read(
+                    _values, RECOMMEND_FALLBACK_QUERY, student_id=student_id, top_k=top_k
+                )
+
+        recommendations = [_recommendation(row) for row in rows]
+
+        _rec_cache[cache_key] = recommendations
+        return list(recommendations)
+
+    async def student_exists(self, student_id: int) -> bool:
+        return bool(await self._read_single(STUDENT_EXISTS_QUERY, student_id=student_id))
+
+    async def stream_recommendations(self, student_id: int, top_k: int) -> AsyncIterator[StudentResponse]:
+        """
+        Yield the same recommendations as recommend_people, best first, as records
+        arrive from Neo4j instead of buffering the whole list. Callers check
+        student_exists first; an unknown id yields nothing.
+        """
+        async with self.db.driver.session(
+            database=self.db.database, default_access_mode=READ_ACCESS
+        ) as session:
+            found = False
+            result = await session.run(RECOMMEND_QUERY, student_id=student_id, top_k=top_k)
+            async for record in result:
+                found = True
+                yield _recommendation(record)
+            if found:
+                return
+
+            result = await session.run(RECOMMEND_FALLBACK_QUERY, student_id=student_id, top_k=top_k)
+            async for record in result:
+                yield _recommendation(record)
+
+    async def ping(self) -> bool:
         """Quick DB connectivity check."""
         try:
-            with self.db.driver.session(database=self.db.database) as session:
-                session.run("RETURN 1").single()
+            async with self.db.driver.session(database=self.db.database) as session:
+                await session.execute_read(_single, PING_QUERY)
             return True
         except Exception:
             return False
 
-    def sync_lowercase_students(self) -> int:
+    async def sync_lowercase_students(self) -> int:
         """
         Lowercase all relevant fields for all Student nodes.
         Returns the number of student nodes processed.
         """
-        with self.db.driver.session(database=self.db.database) as session:
-            result = session.run(
-                """
-                MATCH (s:Student)
-                SET s.name    = CASE WHEN s.name    IS NULL THEN NULL ELSE toLower(s.name)    END,
-                    s.address = CASE WHEN s.address IS NULL THEN NULL ELSE toLower(s.address) END,
-                    s.college = CASE WHEN s.college IS NULL THEN NULL ELSE toLower(s.college) END,
-                    s.board   = CASE WHEN s.board   IS NULL THEN NULL ELSE toLower(s.board)   END,
-                    s.stream  = CASE WHEN s.stream  IS NULL THEN NULL ELSE toLower(s.stream)  END,
-                    s.interests = [x IN coalesce(s.interests, []) | toLower(x)]
-                RETURN count(s) AS processed
-                """
-            )
-            rec = result.single()
-            return rec["processed"] if rec else 0
-    
-    def fuzzy_search_students(self, query: str, threshold: int = 70, limit: int = 10) -> List[StudentDetail]:
+        async with self.db.driver.session(database=self.db.database) as session:
+            rec = await session.execute_write(_single, LOWERCASE_STUDENTS_QUERY)
+        _bump_graph_version()
+        return rec["processed"] if rec else 0
+
+    async def fuzzy_search_students(self, query: str, threshold: int = 70, limit: int = 10) -> List[StudentDetail]:
         """
         Fuzzy search for students by name.
         Args:
@@ -230,38 +465,35 @@ class StudentService:
             List of students matching the fuzzy search, sorted by similarity score.
         """
         query_lower = query.lower().strip()
-        
-        with self.db.driver.session(database=self.db.database) as session:
-            # Get all students
-            result = session.run(
-                """
-                MATCH (s:Student)
-                RETURN s.id as id, s.name as name, s.address as address,
-                       s.college as college, s.board as board, s.stream as stream,
-                       s.interests as interests
-                """
+        if not query_lower:
+            return []
+
+        async with self.db.driver.session(database=self.db.database) as session:
+            rows = await session.execute_read(
+                _values,
+                FUZZY_NAME_CANDIDATES_QUERY,
+                q=_fuzzy_lucene_query(query_lower),
+                candidates=limit * _FUZZY_CANDIDATES_PER_RESULT,
             )
-            
-            students_with_scores = []
-            for record in result:
-                student_name = record["name"] or ""
-                score = fuzz.ratio(query_lower, student_name.lower())
-                
-                if score >= threshold:
-                    students_with_scores.append({
-                        "student": StudentDetail(
-                            id=record["id"],
-                            name=record["name"],
-                            address=record.get("address"),
-                            college=record.get("college"),
-                            board=record.get("board"),
-                            stream=record.get("stream"),
-                            interests=record.get("interests") or [],
-                        ),
-                        "score": score
-                    })
-            
-            # Sort by score descending and limit results
-            students_with_scores.sort(key=lambda x: x["score"], reverse=True)
-            return [item["student"] for item in students_with_scores[:limit]]
 
+        # Re-rank the candidates in one compiled call; extract returns the top
+        # `limit` matches above the threshold, already sorted by score.
+        # Rows are (id, name, address, college, board, stream, interests).
+        names = [(row[1] or "").lower() for row in rows]
+        matches = process.extract(
+            query_lower, names, scorer=fuzz.ratio, score_cutoff=threshold, limit=limit
+        )
+
+        results = []
+        for _, _, index in matches:
+            student_id, name, address, college, board, stream, interests = rows[index]
+            results.append(StudentDetail(
+                id=student_id,
+                name=name,
+                address=address,
+                college=college,
+                board=board,
+                stream=stream,
+                interests=interests or [],
+            ))
+        return results
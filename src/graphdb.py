@@ -8,7 +8,7 @@
 
 import os
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, GraphDatabase
 
 # Load environment variables from .env file
 load_dotenv()
@@ -38,3 +38,28 @@ class Neo4jConnection:
             )
             record = result.single()
             print(f"Created user: {record['u']['name']}, age: {record['u']['age']}")
+
+
+class AsyncNeo4jConnection:
+    """Async counterpart of Neo4jConnection for the FastAPI service, sharing one pooled driver."""
+
+    def __init__(self, database="neo4j", max_connection_pool_size=50):
+        self.uri = os.getenv("NEO4J_URI")
+        self.username = os.getenv("NEO4J_USERNAME")
+        self.password = os.getenv("NEO4J_PASSWORD")
+        self.database = database
+        self.max_connection_pool_size = max_connection_pool_size
+        self.driver = None
+
+    def connect(self):
+        self.driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.username, self.password),
+            max_connection_pool_size=self.max_connection_pool_size,
+        )
+        print(f"Connected to Neo4j database: {self.database}!")
+
+    async def close(self):
+        if self.driver:
+            await self.driver.close()
+            print("Connection closed.")
@@ -1,7 +1,21 @@
 from dotenv import load_dotenv
 from graphdb import Neo4jConnection
+from neo4j import RoutingControl
+from semcache import SemanticCache
+import atexit
+import hashlib
+import io
+from collections import Counter
+from contextlib import closing
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache, TTLCache
 import requests
+from requests.adapters import HTTPAdapter
 import re
+import sys
+import threading
 from rapidfuzz import fuzz, process
 
 # Load environment variables
@@ -11,61 +25,301 @@ load_dotenv()
 neo4j_conn = Neo4jConnection()
 neo4j_conn.connect()
 
+# One pooled keep-alive session for every Ollama call, so the chat loop reuses
+# its TCP connection instead of opening a new one per request.
+OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_EMBED_URL = "http://localhost:11434/api/embed"
+EMBED_MODEL = "nomic-embed-text"
+OLLAMA_TIMEOUT = (10, 300)  # (connect, read) seconds
 
-def get_all_student_names() -> list:
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0))
+SESSION.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip, deflate"})
+atexit.register(SESSION.close)
+
+# Repeated questions are answered from memory instead of re-running the model.
+# Keys are the trimmed, lowercased question; the Cypher cache is kept on disk
+# between runs, tagged with _cypher_cache_version() so a new model or prompt
+# starts from an empty cache.
+QCACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "neo4j_chatbot", "qcache.json")
+_cypher_cache = LRUCache(maxsize=512)
+_chat_cache = LRUCache(maxsize=128)
+# cachetools caches aren't thread-safe and generate_cypher_queries runs
+# generate_cypher_query on a thread pool, so every cache access takes this lock.
+_cache_lock = threading.Lock()
+
+
+def _cypher_cache_version() -> str:
+    source = "\0".join((OLLAMA_MODEL, CYPHER_PROMPT_RULES, CYPHER_PROMPT_TEMPLATE))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_cypher_cache() -> None:
+    try:
+        with open(QCACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if isinstance(data, dict) and data.get("version") == _cypher_cache_version():
+        with _cache_lock:
+            _cypher_cache.update(data.get("queries", {}))
+
+
+def _save_cypher_cache() -> None:
+    try:
+        os.makedirs(os.path.dirname(QCACHE_PATH), exist_ok=True)
+        with open(QCACHE_PATH, "w", encoding="utf-8") as f:
+            with _cache_lock:
+                queries = dict(_cypher_cache)
+            json.dump({"version": _cypher_cache_version(), "queries": queries}, f)
+    except OSError as e:
+        print(f"Error saving query cache: {e}")
+
+
+
+# Regexes used to clean up questions and LLM-generated Cypher, compiled once.
+_RE_CANDIDATE_WORD = re.compile(r'\w{3,}')
+_RE_WORD = re.compile(r'\w+')
+_RE_CODE_FENCE_OPEN = re.compile(r'^```(?:cypher|sql)?\s*\n?', re.MULTILINE)
+_RE_CODE_FENCE_CLOSE = re.compile(r'\n?```\s*$', re.MULTILINE)
+_RE_REL_PAREN_OUT = re.compile(r"-\(\s*(\[[^\]]+\])\s*->")
+_RE_REL_PAREN_IN = re.compile(r"<-\(\s*(\[[^\]]+\])\s*\)-")
+_RE_REL_PAREN_UNDIRECTED = re.compile(r"-\(\s*(\[[^\]]+\])\s*\)-")
+_RE_REL_PAREN_EMPTY = re.compile(r"\(\s*(\[[^\]]+\])\s*\)")
+_RE_WS = re.compile(r"\s+")
+_RE_NAME_EQ_LITERAL = re.compile(r"([A-Za-z_][A-Za-z0-9_]*\.[Nn]ame)\s*=\s*(['\"])(.+?)\2")
+_RE_MAP_NAME_LITERAL = re.compile(r"(\{[^}]*\bname\s*:\s*)(['\"])(.+?)\2")
+_RE_SIZE_BRACKETS = re.compile(r"size\s*\[\s*([^\]]+?)\s*\]")
+_RE_BOUND_R = re.compile(r"\[\s*r\b")
+_RE_VAR_LENGTH_R = re.compile(r"\[r:[^\]]*\*")
+_RE_FIRST_MATCH = re.compile(r"\bMATCH\s+")
+_RE_TYPE_R_AS = re.compile(r"type\(\s*r\s*\)\s+AS\s+(\w+)")
+_RE_TYPE_R = re.compile(r"type\(\s*r\s*\)")
+_RE_MATCH_KEYWORD = re.compile(r"\bMATCH\b", re.IGNORECASE)
+_RE_PACKED_ANSWER = re.compile(r"^\s*(\d+)>", re.MULTILINE)
+_RE_STRING_LITERAL = re.compile(r"(['\"])(.*?)\1")
+_RE_LOWER_NAME_SITE = re.compile(r"(\.name\s*\)\s*=\s*)toLower\(\s*(['\"])(.*?)\2\s*\)")
+_RE_NAME_SITE = re.compile(r"(\.name\s*=\s*|\bname\s*:\s*)(['\"])(.*?)\2")
+# Whole messages that are plainly chat, answered without asking for Cypher.
+_RE_GREETING = re.compile(r"^\s*(?:hi|hello|hey)(?:\s+there)?\s*[!.?]*\s*$", re.IGNORECASE)
+_RE_SMALL_TALK = re.compile(
+    r"^\s*(?:hi|hello|hey|yo|thanks|thank you|how are you|what can you do|help)(?:\s+there)?\s*[!.?]*\s*$",
+    re.IGNORECASE,
+)
+_RE_RETURN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+_RE_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+_RE_UNION = re.compile(r"\bUNION\b", re.IGNORECASE)
+_RE_PARAM_LITERAL = re.compile(r"'([^'\n]*)'|\"([^\"\n]*)\"")
+
+
+def _ollama_chunks(payload: dict):
+    """
+    Yield the parsed chunks of a streaming generate request, up to the final
+    one (done). Closing the generator early drops the connection, which makes
+    Ollama stop generating.
+    """
+    with SESSION.post(OLLAMA_URL, json=payload, stream=True, timeout=OLLAMA_TIMEOUT) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            yield data
+            if data.get("done"):
+                break
+
+
+def _ollama_stream(payload: dict, on_token=None, default: str = "") -> str:
+    """
+    Run a streaming generate request, calling on_token with each chunk as it
+    arrives. Returns the full reply, or `default` if the model sent nothing.
+    """
+    chunks = []
+    for data in _ollama_chunks(payload):
+        token = data.get("response", "")
+        if token:
+            chunks.append(token)
+            if on_token:
+                on_token(token)
+    return "".join(chunks) or default
+
+
+def _cache_key(question: str) -> str:
+    return question.strip().lower()
+
+
+def embed_text(text: str):
+    """Embed text with the local Ollama embedding model; None if unavailable."""
+    try:
+        response = SESSION.post(
+            OLLAMA_EMBED_URL, json={"model": EMBED_MODEL, "input": text}, timeout=OLLAMA_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()["embeddings"][0]
+    except Exception as e:
+        print(f"Error embedding question: {e}")
+        return None
+
+
+# Paraphrases of a question already answered reuse its Cypher. The guard is the
+# set of literal values the question mentions (student names, colleges, boards,
+# streams, addresses, interests, numbers), so "who knows aashish?" can reuse
+# "list aashish's friends" but "science stream" never reuses "commerce stream".
+_semantic_cypher_cache = SemanticCache(embed_text)
+
+# Words of every stored property value the generated Cypher may filter on.
+LITERAL_WORDS_QUERY = """
+MATCH (s:Student)
+UNWIND [s.name, s.college, s.board, s.stream, s.address] + coalesce(s.interests, []) AS value
+WITH DISTINCT toLower(value) AS value
+WHERE value IS NOT NULL
+RETURN value
+"""
+
+
+def _literal_words() -> frozenset:
+    """Lowercase words of all stored property values, from the cache when it's fresh."""
+    with _cache_lock:
+        cached = _name_cache.get("literals")
+    if cached is not None:
+        return cached
+    try:
+        records, _, _ = neo4j_conn.driver.execute_query(
+            LITERAL_WORDS_QUERY, database_=neo4j_conn.database, routing_=RoutingControl.READ,
+        )
+    except Exception as e:
+        print(f"Error fetching property values: {e}")
+        return frozenset()
+    cached = frozenset(word for record in records for word in _RE_WORD.findall(record["value"]))
+    with _cache_lock:
+        _name_cache["literals"] = cached
+    return cached
+
+
+def _semantic_guard(question: str) -> frozenset:
+    """The literal values (property-value words and numbers) the question mentions."""
+    literals = _literal_words()
+    return frozenset(
+        word for word in _RE_WORD.findall(question.lower()) if word in literals or word.isdigit()
+    )
+
+
+# Student names, with their lowercase forms, fetched once and reused for
+# NAME_CACHE_TTL seconds, so fuzzy matching a question doesn't query Neo4j per word.
+# The semantic guard's property-value words are kept the same way.
+# Students onboarded through the API show up once the entry expires.
+NAME_CACHE_TTL = 60
+_name_cache = TTLCache(maxsize=2, ttl=NAME_CACHE_TTL)
+
+
+def invalidate_name_cache() -> None:
+    """Drop the cached name and value lists so the next lookup reads them from Neo4j again."""
+    with _cache_lock:
+        _name_cache.clear()
+
+
+def _student_names() -> tuple:
+    """
+    Return (names, lowercase names, set of lowercase name words), from the
+    cache when it's fresh.
+    """
+    with _cache_lock:
+        cached = _name_cache.get("names")
+    if cached is not None:
+        return cached
     try:
-        with neo4j_conn.driver.session(database=neo4j_conn.database) as session:
-            result = session.run("MATCH (s:Student) RETURN s.name as name")
-            return [record["name"] for record in result if record["name"]]
+        records, _, _ = neo4j_conn.driver.execute_query(
+            "MATCH (s:Student) RETURN s.name as name",
+            database_=neo4j_conn.database, routing_=RoutingControl.READ,
+        )
     except Exception as e:
         print(f"Error fetching student names: {e}")
-        return []
+        return [], [], frozenset()
+    names = [record["name"] for record in records if record["name"]]
+    lower_names = [n.lower() for n in names]
+    name_words = frozenset(word for name in lower_names for word in name.split())
+    cached = (names, lower_names, name_words)
+    with _cache_lock:
+        _name_cache["names"] = cached
+    return cached
+
+
+def get_all_student_names() -> list:
+    return _student_names()[0]
 
 
 def fuzzy_match_student_name(query_name: str, threshold: int = 80) -> str:
-    all_names = get_all_student_names()
-    if not all_names:
-        return query_name
-    
-    result = process.extractOne(query_name.lower(), [n.lower() for n in all_names], scorer=fuzz.ratio)
-    
-    if result and result[1] >= threshold:
-        matched_index = [n.lower() for n in all_names].index(result[0])
-        matched_name = all_names[matched_index]
-        print(f"Fuzzy match: '{query_name}' → '{matched_name}' (score: {result[1]})")
-        return matched_name
-    
-    return query_name
+    return _fuzzy_name_matches([query_name], threshold).get(query_name, query_name)
 
 
-def preprocess_question_with_fuzzy_matching(question: str) -> str:
+# Question words never fuzzy-matched against student names.
+_STOPWORDS = frozenset({
+    'who', 'what', 'where', 'when', 'why', 'how', 'the', 'and', 'are', 'can',
+    'between', 'about', 'student', 'students', 'connection', 'relationship',
+})
 
-    words = question.split()
-    
-    corrected_words = []
-    for word in words:
-        clean_word = re.sub(r'[^\w\s]', '', word)
-        if len(clean_word) >= 3 and clean_word.lower() not in ['who', 'what', 'where', 'when', 'why', 'how', 'the', 'and', 'are', 'can', 'between', 'about', 'student', 'students', 'connection', 'relationship']:
-            matched_name = fuzzy_match_student_name(clean_word, threshold=75)
-            if matched_name != clean_word:
-                corrected_words.append(word.replace(clean_word, matched_name))
-            else:
-                corrected_words.append(word)
-        else:
-            corrected_words.append(word)
-    
-    return ' '.join(corrected_words)
 
+def _fuzzy_name_matches(tokens, threshold: int) -> dict:
+    """
+    Map each token to the student name it matches best, for tokens scoring at
+    least `threshold`. The name list is fetched once for all tokens.
+    """
+    all_names, lower_names, _ = _student_names()
+    matches = {}
+    if not all_names:
+        return matches
+    for token in tokens:
+        # score_cutoff lets rapidfuzz skip names that can't reach the threshold
+        result = process.extractOne(token.lower(), lower_names, scorer=fuzz.ratio, score_cutoff=threshold)
+        if result:
+            matches[token] = all_names[result[2]]
+            print(f"Fuzzy match: '{token}' → '{matches[token]}' (score: {result[1]})")
+    return matches
 
-def generate_cypher_query(question: str) -> str:
+
+def preprocess_question_with_fuzzy_matching(question: str) -> str:
     """
-    Use a local Ollama model to generate a Cypher query from a natural language question.
+    Replace words that look like misspelt student names with the name. Words
+    are found in one regex pass and replaced by span, so punctuation and
+    spacing around them are kept as typed.
     """
-    try:
-        # Define the request payload for Ollama
-        payload = {
-            "model": "llama3.1:8b",
-            "prompt": f"""
+    words = [m for m in _RE_CANDIDATE_WORD.finditer(question) if m.group(0).lower() not in _STOPWORDS]
+    # Words already spelt like (part of) a student's name need no fuzzy match
+    name_words = _student_names()[2]
+    words = [m for m in words if m.group(0).lower() not in name_words]
+    # Match every distinct candidate word in one go
+    matches = _fuzzy_name_matches(dict.fromkeys(m.group(0) for m in words), threshold=75)
+    if not matches:
+        return question
+
+    parts = []
+    prev = 0
+    for m in words:
+        matched_name = matches.get(m.group(0))
+        if matched_name is not None and matched_name != m.group(0):
+            parts.append(question[prev:m.start()])
+            parts.append(matched_name)
+            prev = m.end()
+    parts.append(question[prev:])
+    return "".join(parts)
+
+
+# Static instructions go in Ollama's "system" field and only the question (and
+# results) in "prompt", so every request shares the same prefix and the server
+# can reuse its cached KV for it instead of prefilling the rules each time.
+OLLAMA_MODEL = "llama3.1:8b"
+OLLAMA_OPTIONS = {"num_ctx": 2048}
+# A single query never needs more tokens than this; it stops a model that starts
+# rambling or repeating itself from generating until the timeout.
+CYPHER_MAX_TOKENS = 256
+CYPHER_OPTIONS = {**OLLAMA_OPTIONS, "num_predict": CYPHER_MAX_TOKENS}
+# Explanations and chat replies are asked for in one or two sentences.
+REPLY_MAX_TOKENS = 200
+REPLY_OPTIONS = {**OLLAMA_OPTIONS, "num_predict": REPLY_MAX_TOKENS}
+# Questions per packed Cypher request, so rules + questions + answers fit num_ctx.
+PACKED_BATCH_SIZE = 5
+
+CYPHER_PROMPT_RULES = """
 You are an expert Neo4j Cypher developer and graph data modeler. Produce a single valid Cypher query only, no explanation or extra text.
 
 Absolute instructions (do not change behavior elsewhere in the code):
@@ -125,126 +379,512 @@ A: CHAT
 
 Fallback rule:
 - If the input is not a single-name or two-name detected case, produce the most concise, syntactically-correct Cypher that answers the natural-language question while respecting the rules above. If the input is casual chat, return `CHAT`.
+""".strip()
+
+
+EXPLAIN_PROMPT_RULES = """
+You are a helpful assistant. Produce a concise, conversational reply (one or two sentences) for a user based on the question and the database results.
 
-Question:
-{question}
-""",
-            "stream": False
+Instructions:
+- Keep the reply short and natural (like a chat reply).
+- If the results list student objects, mention up to 5 names or summarize if many.
+- If shared interests are present, list the common interests succinctly.
+- Do NOT include JSON, code blocks, or internal keys; only plain text.
+""".strip()
+
+CHAT_PROMPT_RULES = """
+You are a friendly chatbot.
+
+Rules:
+- If the user's message is a greeting like "hi", "hello", or "hey", respond exactly:
+  Hi there! How's your day going so far? Is there something I can help you with or would you like to just have a friendly conversation?
+- Otherwise, reply naturally, be concise (one or two sentences), and offer help.
+""".strip()
+
+# Per-request "prompt" bodies; filled with % so braces in user text are left alone.
+CYPHER_PROMPT_TEMPLATE = "Question:\n%s\n"
+EXPLAIN_PROMPT_TEMPLATE = "Question:\n%s\n\nDatabase Results:\n%s\n\nReply:\n"
+CHAT_PROMPT_TEMPLATE = "User:\n%s\n\nReply:\n"
+
+
+_load_cypher_cache()
+atexit.register(_save_cypher_cache)
+
+
+CYPHER_ERROR_REPLY = "I'm sorry, but I couldn't generate a Cypher query."
+# The reply CHAT_PROMPT_RULES asks for on a plain greeting.
+GREETING_REPLY = (
+    "Hi there! How's your day going so far? Is there something I can help you with "
+    "or would you like to just have a friendly conversation?"
+)
+CHAT_ERROR_REPLY = "I'm sorry, but I'm having trouble generating a response right now."
+
+
+def _sanitize_cypher_regex(q: str) -> str:
+    # Fix patterns where relationships are accidentally wrapped in parentheses like -([r]-> or -([r])- etc.
+    q = _RE_REL_PAREN_OUT.sub(r"-\1->", q)
+    q = _RE_REL_PAREN_IN.sub(r"<-\1-", q)
+    q = _RE_REL_PAREN_UNDIRECTED.sub(r"-\1-", q)
+    # Remove empty parentheses accidentally placed around relationship variables: ( [r] ) -> [r]
+    q = _RE_REL_PAREN_EMPTY.sub(r"\1", q)
+    # Normalize multiple spaces
+    q = _RE_WS.sub(" ", q).strip()
+    return q
+
+
+def _skip_ws(q: str, i: int) -> int:
+    while i < len(q) and q[i].isspace():
+        i += 1
+    return i
+
+
+def _wrapped_relationship(q: str, i: int):
+    """
+    If q[i] is the "(" of a parenthesised relationship like ( [r] ) or -([r]->,
+    return (index to resume at, "[...]"); otherwise None.
+    """
+    j = _skip_ws(q, i + 1)
+    if j >= len(q) or q[j] != "[":
+        return None
+    k = q.find("]", j + 1)
+    if k <= j + 1:
+        return None
+    m = _skip_ws(q, k + 1)
+    if m < len(q) and q[m] == ")":
+        return m + 1, q[j:k + 1]
+    if i > 0 and q[i - 1] == "-" and q.startswith("->", m):
+        return m, q[j:k + 1]
+    return None
+
+
+def _sanitize_cypher_one_pass(q: str) -> str:
+    """
+    Same result as _sanitize_cypher_regex in one left-to-right scan: unwrap
+    parenthesised relationships and collapse whitespace as we go.
+    """
+    out = []
+    pending_space = False
+    i, n = 0, len(q)
+    while i < n:
+        ch = q[i]
+        if ch.isspace():
+            pending_space = True
+            i += 1
+            continue
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        if ch == "(":
+            wrapped = _wrapped_relationship(q, i)
+            if wrapped is not None:
+                i, rel = wrapped
+                out.append(" ".join(rel.split()))
+                continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+# CYPHER_SANITIZE_LEGACY=1 switches back to the regex chain for A/B comparison.
+sanitize_cypher = (
+    _sanitize_cypher_regex if os.getenv("CYPHER_SANITIZE_LEGACY") == "1" else _sanitize_cypher_one_pass
+)
+
+
+def generate_cypher_query(question: str) -> str:
+    """
+    Use a local Ollama model to generate a Cypher query from a natural language question.
+    Answers are cached per normalized question; failures are not cached.
+    Greetings and small talk return CHAT without calling the model.
+    """
+    if _RE_SMALL_TALK.match(question):
+        return "CHAT"
+    key = _cache_key(question)
+    with _cache_lock:
+        cached = _cypher_cache.get(key)
+    if cached is not None:
+        return cached
+
+    guard = _semantic_guard(question)
+    vector = _semantic_cypher_cache.vector(key)
+    cached = _semantic_cypher_cache.lookup(vector, guard=guard)
+    if cached is not None:
+        with _cache_lock:
+            _cypher_cache[key] = cached
+        return cached
+
+    query = _generate_cypher_uncached(question)
+    if query != CYPHER_ERROR_REPLY:
+        with _cache_lock:
+            _cypher_cache[key] = query
+        _semantic_cypher_cache.add(vector, query, guard=guard)
+    return query
+
+
+# Strip markdown code blocks (```, ```cypher, etc.)
+def _strip_markdown_code_blocks(text: str) -> str:
+    if "```" not in text:
+        return text.strip()
+    # Remove opening code fence (```cypher, ```sql, or just ```)
+    text = _RE_CODE_FENCE_OPEN.sub('', text.strip())
+    # Remove closing code fence
+    text = _RE_CODE_FENCE_CLOSE.sub('', text.strip())
+    return text.strip()
+
+
+# s.name = "Literal" -> toLower(s.name) = toLower("literal")
+def _lower_name_eq(m) -> str:
+    prop = m.group(1)
+    quote = m.group(2)
+    lit = m.group(3)
+    return f"toLower({prop}) = toLower({quote}{lit.lower()}{quote})"
+
+
+# MATCH (s:Student {name: "Literal"}) -> lower the literal only
+def _lower_map_name(m) -> str:
+    prefix = m.group(1)
+    quote = m.group(2)
+    lit = m.group(3)
+    return f"{prefix}{quote}{lit.lower()}{quote}"
+
+
+# Ensure case-insensitive matching for Student name comparisons and lowercase literals
+def _enforce_case_insensitive_name_matching(q: str) -> str:
+    # Both rewrites need a quoted literal after a `name` property
+    if "ame" not in q or ("'" not in q and '"' not in q):
+        return q
+    q = _RE_NAME_EQ_LITERAL.sub(_lower_name_eq, q)
+    q = _RE_MAP_NAME_LITERAL.sub(_lower_map_name, q)
+    return q
+
+
+# Fix incorrect size[list comprehension] usage (should be size([ ... ])).
+def _fix_size_brackets(q: str) -> str:
+    # Replace size[<expr>] with size([<expr>])
+    if "size" not in q:
+        return q
+    return _RE_SIZE_BRACKETS.sub(r"size([\1])", q)
+
+
+# Further fix: if the query returns relationship types via type(r) but r wasn't bound,
+# try to bind r to the first relationship pattern, or if the relationship is variable-length,
+# convert the MATCH into a path `p` and return the list of relationship types.
+def _fix_unbound_relationship_types(q: str) -> str:
+    if "type(" not in q:
+        return q
+    # If r is already bound, nothing to do
+    if _RE_BOUND_R.search(q):
+        return q
+
+    q_work = q
+    # Try to bind `r` to the first occurrence of an anonymous relationship pattern
+    # Replace first '<-[:' or '-[:' occurrence
+    if "<-[:" in q_work:
+        q_work = q_work.replace("<-[:", "<-[r:", 1)
+    elif "-[:" in q_work:
+        q_work = q_work.replace("-[:", "-[r:", 1)
+
+    # If the bound relationship is variable-length (contains '*'), use path approach
+    if _RE_VAR_LENGTH_R.search(q_work):
+        # Ensure MATCH uses a path variable `p =` for the first MATCH occurrence
+        q_work = _RE_FIRST_MATCH.sub("MATCH p = ", q_work, count=1)
+        # Replace occurrences of `type(r)` with mapping over relationships(p)
+        q_work = _RE_TYPE_R_AS.sub(r"[rel IN relationships(p) | type(rel)] AS \1", q_work)
+        q_work = _RE_TYPE_R.sub("[rel IN relationships(p) | type(rel)]", q_work)
+    # For a simple fixed-length relationship, `type(r)` already returns a single rel
+    # (we injected r into the pattern above)
+
+    return q_work
+
+
+def _clean_generated_cypher(raw: str) -> str:
+    """Strip code fences from an LLM answer and repair common Cypher mistakes."""
+    raw = _strip_markdown_code_blocks(raw)
+    # Sanitize and fix common Cypher syntax mistakes emitted by LLMs
+    fixed = sanitize_cypher(raw)
+    fixed = _enforce_case_insensitive_name_matching(fixed)
+    fixed = _fix_size_brackets(fixed)
+    return _fix_unbound_relationship_types(fixed)
+
+
+def _complete_cypher_reply(text: str):
+    """
+    Return the streamed Cypher reply cut at the end of its answer once it holds
+    a whole one (CHAT, a closed code fence, or a `;` outside quotes), else None.
+    Anything after that is prose the rules ask the model not to write, so it
+    isn't worth waiting for.
+    """
+    if text.lstrip()[:4].upper() == "CHAT":
+        return text
+    if text.count("```") >= 2:
+        return text[:text.index("```", text.index("```") + 3) + 3]
+    if ";" not in text:
+        return None
+    # Track which quote is open, so "O'Brien" doesn't hide the terminating `;`
+    quote = None
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == ";":
+            return text[:i + 1]
+    return None
+
+
+def _generate_cypher_uncached(question: str) -> str:
+    try:
+        # Define the request payload for Ollama
+        payload = {
+            "model": OLLAMA_MODEL,
+            "system": CYPHER_PROMPT_RULES,
+            "prompt": CYPHER_PROMPT_TEMPLATE % question,
+            "stream": True,
+            "options": CYPHER_OPTIONS,
         }
-        # Send the HTTP POST request to Ollama
-        response = requests.post("http://localhost:11434/api/generate", json=payload)
-        response.raise_for_status()  # Raise an error for HTTP issues
+        # Stream the reply and hang up as soon as the query is complete
+        raw = ""
+        with closing(_ollama_chunks(payload)) as chunks:
+            for data in chunks:
+                raw += data.get("response", "")
+                if data.get("done_reason") == "length":
+                    # Cut off at CYPHER_MAX_TOKENS: whatever came back is not a whole query
+                    print("Error in generate_cypher_query: reply hit the token limit")
+                    return CYPHER_ERROR_REPLY
+                complete = _complete_cypher_reply(raw)
+                if complete is not None:
+                    raw = complete
+                    break
+        if not raw.strip():
+            return CYPHER_ERROR_REPLY
+
+        return _clean_generated_cypher(raw)
+    except Exception as e:
+        print(f"Error in generate_cypher_query: {e}")
+        return CYPHER_ERROR_REPLY
+
+
+def _generate_cypher_packed(questions: list) -> list:
+    """
+    Ask for all questions' Cypher in one request, so the rules block is sent and
+    prefilled once. Returns one answer per question, None where the model's reply
+    had none.
+    """
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+    prompt = (
+        f"Answer each of the following {len(questions)} questions separately. Start each answer "
+        f"on a new line with its number and '>' (for example `1> MATCH ...` or `2> CHAT`).\n\n"
+        f"Questions:\n{numbered}\n"
+    )
+    try:
+        response = SESSION.post(
+            OLLAMA_URL, json={"model": OLLAMA_MODEL, "system": CYPHER_PROMPT_RULES, "prompt": prompt,
+                              "stream": False,
+                              "options": {**OLLAMA_OPTIONS, "num_predict": CYPHER_MAX_TOKENS * len(questions)}},
+            timeout=OLLAMA_TIMEOUT,
+        )
+        response.raise_for_status()
         data = response.json()
-        raw = data.get("response", "I'm sorry, I couldn't generate a Cypher query.")
-        
-        # Strip markdown code blocks (```, ```cypher, etc.)
-        def strip_markdown_code_blocks(text: str) -> str:
-            # Remove opening code fence (```cypher, ```sql, or just ```)
-            text = re.sub(r'^```(?:cypher|sql)?\s*\n?', '', text.strip(), flags=re.MULTILINE)
-            # Remove closing code fence
-            text = re.sub(r'\n?```\s*$', '', text.strip(), flags=re.MULTILINE)
-            return text.strip()
-        
-        raw = strip_markdown_code_blocks(raw)
-        
-        # Sanitize and fix common Cypher syntax mistakes emitted by LLMs
-        def sanitize_cypher(q: str) -> str:
-            # Fix patterns where relationships are accidentally wrapped in parentheses like -([r]-> or -([r])- etc.
-            q = re.sub(r"-\(\s*(\[[^\]]+\])\s*->", r"-\1->", q)
-            q = re.sub(r"<-\(\s*(\[[^\]]+\])\s*\)-", r"<-\1-", q)
-            q = re.sub(r"-\(\s*(\[[^\]]+\])\s*\)-", r"-\1-", q)
-            # Remove empty parentheses accidentally placed around relationship variables: ( [r] ) -> [r]
-            q = re.sub(r"\(\s*(\[[^\]]+\])\s*\)", r"\1", q)
-            # Normalize multiple spaces
-            q = re.sub(r"\s+", " ", q).strip()
-            return q
-
-        fixed = sanitize_cypher(raw)
-
-        # Ensure case-insensitive matching for Student name comparisons and lowercase literals
-        def enforce_case_insensitive_name_matching(q: str) -> str:
-            # s.name = "Literal" -> toLower(s.name) = toLower("literal")
-            def eq_repl(m):
-                prop = m.group(1)
-                quote = m.group(2)
-                lit = m.group(3)
-                return f"toLower({prop}) = toLower({quote}{lit.lower()}{quote})"
-            q = re.sub(r"([A-Za-z_][A-Za-z0-9_]*\.[Nn]ame)\s*=\s*(['\"])(.+?)\2", eq_repl, q)
-
-            # MATCH (s:Student {name: "Literal"}) -> lower the literal only
-            def map_repl(m):
-                prefix = m.group(1)
-                quote = m.group(2)
-                lit = m.group(3)
-                return f"{prefix}{quote}{lit.lower()}{quote}"
-            q = re.sub(r"(\{[^}]*\bname\s*:\s*)(['\"])(.+?)\2", map_repl, q)
-            return q
-
-        fixed = enforce_case_insensitive_name_matching(fixed)
-
-        # Fix incorrect size[list comprehension] usage (should be size([ ... ])).
-        def fix_size_brackets(q: str) -> str:
-            # Replace size[<expr>] with size([<expr>])
-            return re.sub(r"size\s*\[\s*([^\]]+?)\s*\]", r"size([\1])", q)
-
-        fixed = fix_size_brackets(fixed)
-
-        # Further fix: if the query returns relationship types via type(r) but r wasn't bound,
-        # try to bind r to the first relationship pattern, or if the relationship is variable-length,
-        # convert the MATCH into a path `p` and return the list of relationship types.
-        def fix_unbound_relationship_types(q: str) -> str:
-            if "type(" not in q:
-                return q
-            # If r is already bound, nothing to do
-            if re.search(r"\[\s*r\b", q):
-                return q
-
-            q_work = q
-            # Try to bind `r` to the first occurrence of an anonymous relationship pattern
-            # Replace first '<-[:' or '-[:' occurrence
-            if "<-[:" in q_work:
-                q_work = q_work.replace("<-[:", "<-[r:", 1)
-            elif "-[:" in q_work:
-                q_work = q_work.replace("-[:", "-[r:", 1)
-
-            # If the bound relationship is variable-length (contains '*'), use path approach
-            if re.search(r"\[r:[^\]]*\*", q_work):
-                # Ensure MATCH uses a path variable `p =` for the first MATCH occurrence
-                q_work = re.sub(r"\bMATCH\s+", "MATCH p = ", q_work, count=1)
-                # Replace occurrences of `type(r)` with mapping over relationships(p)
-                q_work = re.sub(r"type\(\s*r\s*\)\s+AS\s+(\w+)", r"[rel IN relationships(p) | type(rel)] AS \1", q_work)
-                q_work = re.sub(r"type\(\s*r\s*\)", "[rel IN relationships(p) | type(rel)]", q_work)
+        raw = data.get("response", "")
+    except Exception as e:
+        print(f"Error in generate_cypher_queries: {e}")
+        return [None] * len(questions)
+
+    answers = [None] * len(questions)
+    parts = _RE_PACKED_ANSWER.split(raw)
+    last = None
+    for number, text in zip(parts[1::2], parts[2::2]):
+        index = int(number) - 1
+        if 0 <= index < len(questions) and answers[index] is None and text.strip():
+            answers[index] = _clean_generated_cypher(text)
+            last = index
+    if data.get("done_reason") == "length" and last is not None:
+        # The reply was cut off mid-answer; let that question be retried on its own
+        answers[last] = None
+    return answers
+
+
+def generate_cypher_queries(questions: list, max_workers: int = 4, packed: bool = False) -> list:
+    """
+    Generate Cypher for several questions (e.g. batch evaluation). Results keep
+    the order of `questions`, and cached questions are not sent again.
+
+    By default questions run concurrently over the pooled Ollama session, which
+    pays off when the server runs requests in parallel (OLLAMA_NUM_PARALLEL > 1).
+    With packed=True they go out PACKED_BATCH_SIZE per prompt instead; any
+    question the packed reply misses is retried on its own.
+    """
+    if not packed:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(generate_cypher_query, questions))
+
+    with _cache_lock:
+        results = [
+            "CHAT" if _RE_SMALL_TALK.match(q) else _cypher_cache.get(_cache_key(q)) for q in questions
+        ]
+    pending = [i for i, cached in enumerate(results) if cached is None]
+    for start in range(0, len(pending), PACKED_BATCH_SIZE):
+        batch = pending[start:start + PACKED_BATCH_SIZE]
+        answers = _generate_cypher_packed([questions[i] for i in batch])
+        for i, answer in zip(batch, answers):
+            if answer is None:
+                results[i] = generate_cypher_query(questions[i])
             else:
-                # For simple fixed-length relationship, ensure `type(r)` returns single rel
-                # (we already injected r into pattern above)
-                pass
+                with _cache_lock:
+                    _cypher_cache[_cache_key(questions[i])] = answer
+                results[i] = answer
+    return results
 
-            return q_work
 
-        fixed2 = fix_unbound_relationship_types(fixed)
+def _parameterize_literals(query: str):
+    """
+    Replace the string literals in a generated query with parameters ($p0, $p1, ...)
+    so queries that differ only in e.g. the student name share one cached plan in
+    Neo4j. Queries with escapes or backtick-quoted names are left as they are.
+    """
+    if "\\" in query or "`" in query:
+        return query, {}
+    params = {}
+
+    def to_param(m):
+        key = f"p{len(params)}"
+        params[key] = m.group(1) if m.group(1) is not None else m.group(2)
+        return f"${key}"
+
+    return _RE_PARAM_LITERAL.sub(to_param, query), params
+
+
+# Generated read queries without a LIMIT of their own are capped at this many rows,
+# and results longer than MAX_LOGGED_RESULTS are logged by count only.
+MAX_RESULT_ROWS = 200
+MAX_LOGGED_RESULTS = 20
+
+
+def _top_level(query: str) -> str:
+    """The query with string literals and everything inside braces blanked out."""
+    out = []
+    depth = 0
+    quote = None
+    for ch in query:
+        if quote:
+            if ch == quote:
+                quote = None
+            out.append(" ")
+        elif ch in "'\"`":
+            quote = ch
+            out.append(" ")
+        elif ch == "{":
+            depth += 1
+            out.append(" ")
+        elif ch == "}":
+            depth = max(depth - 1, 0)
+            out.append(" ")
+        else:
+            out.append(" " if depth else ch)
+    return "".join(out)
 
-        return fixed2
-    except Exception as e:
-        print(f"Error in generate_cypher_query: {e}")
-        return "I'm sorry, but I couldn't generate a Cypher query."
+
+def _with_row_limit(query: str) -> str:
+    """
+    Append LIMIT MAX_RESULT_ROWS to a query whose final top-level clause is a
+    RETURN without a LIMIT. A RETURN or LIMIT inside a CALL { ... } subquery
+    doesn't count, and UNION queries are left alone.
+    """
+    top = _top_level(query)
+    returns = list(_RE_RETURN.finditer(top))
+    if not returns or _RE_UNION.search(top) or _RE_LIMIT.search(top, returns[-1].end()):
+        return query
+    return f"{query.rstrip().rstrip(';')} LIMIT {MAX_RESULT_ROWS}"
+
+
+def _log_results(results: list) -> None:
+    # Log the results for debugging; only the count when there are many
+    if len(results) > MAX_LOGGED_RESULTS:
+        print(f"Query Results: {len(results)} records")
+    else:
+        print(f"Query Results: {results}")
 
 
-def execute_cypher_query(query: str) -> list:
+def execute_cypher_query(query: str, fields: tuple = ()) -> list:
     """
     Execute the Cypher query on the Neo4j database using Neo4jConnection and return the result.
+    driver.execute_query manages the session and retries transient failures.
+    With `fields`, only those columns are kept, read positionally, instead of
+    converting every column of every record with record.data().
+    String literals are sent as parameters (see _parameterize_literals), and
+    queries without a LIMIT return at most MAX_RESULT_ROWS rows.
     """
     results = []
     try:
         print(f"Executing Cypher Query: {query}")  # Log the query being executed
-        with neo4j_conn.driver.session(database=neo4j_conn.database) as session:
-            result = session.run(query)
-            results = [record.data() for record in result]
-        print(f"Query Results: {results}")  # Log the results for debugging
+        parameterized, params = _parameterize_literals(query)
+        records, _, _ = neo4j_conn.driver.execute_query(
+            _with_row_limit(parameterized), params, database_=neo4j_conn.database
+        )
+        if fields:
+            results = [dict(zip(fields, record.values(*fields))) for record in records]
+        else:
+            results = [record.data() for record in records]
+        _log_results(results)
     except Exception as e:
         print(f"Error executing query: {e}")
     return results
 
 
+def _single_name_template(query: str):
+    """
+    For a query whose only string literal is a student name it matches on, return
+    (query with that literal replaced by the variable `__name`, name); else None.
+    """
+    if len(_RE_STRING_LITERAL.findall(query)) != 1:
+        return None
+    for site in (_RE_LOWER_NAME_SITE, _RE_NAME_SITE):
+        m = site.search(query)
+        if m:
+            template = query[:m.start()] + m.group(1) + "__name" + query[m.end():]
+            return template.strip().rstrip(";"), m.group(3)
+    return None
+
+
+def execute_cypher_queries(queries: list) -> list:
+    """
+    Execute several generated queries, returning one result list per query.
+    When they are all the same single-name lookup (e.g. "details about A", "... B"),
+    they run as one UNWIND query and the rows are handed back by name. Each name's
+    lookup is capped at MAX_RESULT_ROWS, as when the queries run one by one.
+    """
+    shapes = [_single_name_template(q) for q in queries]
+    templates = {shape[0] for shape in shapes if shape}
+    if len(queries) < 2 or not all(shapes) or len(templates) != 1:
+        return [execute_cypher_query(q) for q in queries]
+
+    names = list(dict.fromkeys(name for _, name in shapes))
+    template = _with_row_limit(templates.pop())
+    fused = f"UNWIND $names AS __name CALL {{ WITH __name {template} }} RETURN *, __name AS _key"
+    try:
+        print(f"Executing fused Cypher Query for {len(names)} names: {fused}")
+        records, _, _ = neo4j_conn.driver.execute_query(
+            fused, {"names": names}, database_=neo4j_conn.database
+        )
+    except Exception as e:
+        print(f"Error executing fused query, running queries one by one: {e}")
+        return [execute_cypher_query(q) for q in queries]
+
+    by_name = {name: [] for name in names}
+    for record in records:
+        row = record.data()
+        key = row.pop("_key")
+        row.pop("__name", None)
+        by_name[key].append(row)
+    _log_results([row for rows in by_name.values() for row in rows])
+    return [by_name[name] for _, name in shapes]
+
+
+# Student properties explain_result lists, in order, before the interests.
+_STUDENT_FIELDS = ("name", "address", "college", "board", "stream")
+
+
 def explain_result(question: str, result: list) -> str:
     """
     Explain the result of the Cypher query in natural language.
@@ -260,37 +900,108 @@ def explain_result(question: str, result: list) -> str:
         count = result[0]["COUNT(s)"]
         return f"There are {count} students matching your query in the database."
 
-    # Handle multiple student records
-    explanations = []
+    # Write every student's details straight into one buffer, blank line between students
+    buf = io.StringIO()
+    buf.write("I found the following students matching your query:\n\n")
+    sep = ""
     for record in result:
-        if "s" in record:
-            student = record["s"]
-            details = []
-            if "name" in student:
-                details.append(f"Name: {student['name']}")
-            if "address" in student:
-                details.append(f"Address: {student['address']}")
-            if "college" in student:
-                details.append(f"College: {student['college']}")
-            if "board" in student:
-                details.append(f"Board: {student['board']}")
-            if "stream" in student:
-                details.append(f"Stream: {student['stream']}")
-            if "interests" in student:
-                interests = ", ".join(student['interests'])
-                details.append(f"Interests: {interests}")
-
-            explanations.append("\n".join(details))
-
-    # Combine all student details into a conversational response
-    response = "I found the following students matching your query:\n\n"
-    response += "\n\n".join(explanations)
-    return response
-
-
-def explain_result_with_llm(question: str, result: list) -> str:
+        student = record.get("s") or record.get("student")
+        if isinstance(student, dict):
+            buf.write(sep)
+            sep = "\n\n"
+            line_sep = ""
+            for k in _STUDENT_FIELDS:
+                if (v := student.get(k)) is not None:
+                    buf.write(f"{line_sep}{k.title()}: {v}")
+                    line_sep = "\n"
+            if interests := student.get("interests"):
+                buf.write(f"{line_sep}Interests: ")
+                buf.write(", ".join(interests))
+
+    return buf.getvalue()
+
+
+# How often explain_result_with_llm answered locally, by result shape, versus
+# falling through to the LLM ("llm").
+explain_fast_path_hits = Counter()
+
+_RELATIONSHIP_FLAGS = (("same_college", "college"), ("same_board", "board"), ("same_stream", "stream"))
+
+
+def _join_words(items: list) -> str:
+    """'a', 'a and b', 'a, b and c'."""
+    if len(items) <= 2:
+        return " and ".join(items)
+    return f"{', '.join(items[:-1])} and {items[-1]}"
+
+
+def _explain_relationship(result: list) -> str:
+    """
+    Render the two-name relationship query's rows (one per connecting path)
+    as a short reply.
+    """
+    record = result[0]
+    a = (record.get("a") or {}).get("name", "The first student")
+    b = (record.get("b") or {}).get("name", "the second student")
+    shared = [label for flag, label in _RELATIONSHIP_FLAGS if record.get(flag)]
+    rel_types = sorted({t for r in result for t in r.get("rel_types") or [] if t})
+    interests = record.get("common_interests") or []
+
+    parts = []
+    if shared:
+        parts.append(f"share the same {_join_words(shared)}")
+    if interests:
+        parts.append(f"have common interests in {_join_words(interests)}")
+    if rel_types:
+        parts.append(f"are connected by {_join_words(rel_types)}")
+    if not parts:
+        return f"{a} and {b} don't seem to have anything in common."
+    return " ".join([f"{a} and {b} {parts[0]}."] + [f"They {part}." for part in parts[1:]])
+
+
+def _compact_results(result: list, max_names: int = 5) -> str:
+    """
+    Summarize query results for the explanation prompt, keeping only what the
+    reply uses: up to `max_names` student names (nodes, or any column ending
+    in "name"), shared interests, and the first `max_names` values of every
+    other plain column (e.g. same_college, rel_types, s.college).
+    """
+    names = []
+    common = []
+    columns = {}
+    for record in result:
+        for key, value in record.items():
+            if isinstance(value, dict):
+                value = value.get("name")
+                key = "name"
+            if key.lower().endswith("name"):
+                if value and value not in names:
+                    names.append(value)
+            elif key == "common_interests":
+                common.extend(x for x in value or () if x not in common)
+            else:
+                if isinstance(value, list):
+                    value = ", ".join(str(x) for x in value if not isinstance(x, dict)) or "none"
+                columns.setdefault(key, []).append(value)
+
+    lines = [f"Records: {len(result)}"]
+    if names:
+        head = ", ".join(names[:max_names])
+        more = len(names) - max_names
+        lines.append(f"Students: {head} and {more} more" if more > 0 else f"Students: {head}")
+    if common:
+        lines.append(f"Common interests: {', '.join(common)}")
+    for key, values in columns.items():
+        head = "; ".join(str(x) for x in values[:max_names])
+        more = len(values) - max_names
+        lines.append(f"{key}: {head} and {more} more" if more > 0 else f"{key}: {head}")
+    return "\n".join(lines)
+
+
+def explain_result_with_llm(question: str, result: list, on_token=None) -> str:
     """
     Use the LLM to generate a conversational explanation of the query results.
+    When the LLM is used, on_token receives the reply as it streams in.
     """
     try:
         # Handle empty results quickly
@@ -311,78 +1022,125 @@ def explain_result_with_llm(question: str, result: list) -> str:
                     if isinstance(v, (int, float)) and not isinstance(v, bool):
                         return f"There are {v} students in your database."
 
-        # Call the LLM for a concise conversational explanation
-        # Format the result compactly
-        result_str = repr(result)
-        payload = {
-            "model": "llama3.1:8b",
-            "prompt": f"""
-You are a helpful assistant. Produce a concise, conversational reply (one or two sentences) for a user based on the question and the database results.
-
-Instructions:
-- Keep the reply short and natural (like a chat reply).
-- If the results list student objects, mention up to 5 names or summarize if many.
-- If shared interests are present, list the common interests succinctly.
-- Do NOT include JSON, code blocks, or internal keys; only plain text.
+        # Two-name relationship query: render it from its flags directly
+        if all(any(flag in r for flag, _ in _RELATIONSHIP_FLAGS) for r in result):
+            explain_fast_path_hits["relationship"] += 1
+            return _explain_relationship(result)
 
-Question:
-{question}
+        # A few plain student records read fine without the LLM
+        if len(result) <= 3 and all(
+            isinstance(r.get("s") or r.get("student"), dict) for r in result
+        ):
+            explain_fast_path_hits["students"] += 1
+            return explain_result(question, result)
 
-Database Results:
-{result_str}
+        explain_fast_path_hits["llm"] += 1
 
-Reply:
-""",
-            "stream": False
+        # Call the LLM for a concise conversational explanation
+        # Format the result compactly
+        result_str = _compact_results(result)
+        payload = {
+            "model": OLLAMA_MODEL,
+            "system": EXPLAIN_PROMPT_RULES,
+            "prompt": EXPLAIN_PROMPT_TEMPLATE % (question, result_str),
+            "stream": True,
+            "options": REPLY_OPTIONS,
         }
         # Send the HTTP POST request to Ollama
-        response = requests.post("http://localhost:11434/api/generate", json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("response", "I'm sorry, I couldn't generate an explanation.")
+        return _ollama_stream(payload, on_token, "I'm sorry, I couldn't generate an explanation.")
     except Exception as e:
         print(f"Error in explain_result_with_llm: {e}")
         return "I'm sorry, but I couldn't generate an explanation."
 
 
-def normal_chat(question: str) -> str:
+def normal_chat(question: str, on_token=None) -> str:
     """
     Handle normal chatbot conversations using a local Ollama model.
+    Replies are cached per normalized message; failures are not cached.
+    Uncached replies are passed to on_token as they stream in.
+    A plain greeting gets GREETING_REPLY without calling the model.
     """
+    if _RE_GREETING.match(question):
+        return GREETING_REPLY
+    key = _cache_key(question)
+    with _cache_lock:
+        cached = _chat_cache.get(key)
+    if cached is not None:
+        return cached
+    reply = _normal_chat_uncached(question, on_token)
+    if reply != CHAT_ERROR_REPLY:
+        with _cache_lock:
+            _chat_cache[key] = reply
+    return reply
+
+
+def _normal_chat_uncached(question: str, on_token=None) -> str:
     try:
         payload = {
-            "model": "llama3.1:8b",
-            "prompt": f"""
-You are a friendly chatbot.
-
-Rules:
-- If the user's message is a greeting like "hi", "hello", or "hey", respond exactly:
-  Hi there! How's your day going so far? Is there something I can help you with or would you like to just have a friendly conversation?
-- Otherwise, reply naturally, be concise (one or two sentences), and offer help.
-
-User:
-{question}
-
-Reply:
-""",
-            "stream": False
+            "model": OLLAMA_MODEL,
+            "system": CHAT_PROMPT_RULES,
+            "prompt": CHAT_PROMPT_TEMPLATE % question,
+            "stream": True,
+            "options": REPLY_OPTIONS,
         }
-        response = requests.post("http://localhost:11434/api/generate", json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("response", "I'm sorry, I couldn't generate a response.")
+        return _ollama_stream(payload, on_token, "I'm sorry, I couldn't generate a response.")
     except Exception as e:
         print(f"Error in normal_chat: {e}")
-        return "I'm sorry, but I'm having trouble generating a response right now."
+        return CHAT_ERROR_REPLY
 
 
+def _print_reply(generate, *args) -> None:
+    """
+    Print a reply from explain_result_with_llm / normal_chat, token by token when
+    it streams from the model, or whole when it was answered locally or cached.
+    """
+    streamed = []
+
+    def echo(token: str) -> None:
+        streamed.append(token)
+        sys.stdout.write(token)
+        sys.stdout.flush()
 
+    reply = generate(*args, on_token=echo)
+    if not streamed:
+        print(reply)
+    elif reply != "".join(streamed):
+        print(f"\n{reply}")
+    else:
+        print()
+
+
+def _answer_batch(questions: list) -> None:
+    """
+    Answer several questions from one input line: their Cypher is generated
+    concurrently and executed together, then each gets its own reply.
+    """
+    corrected = [preprocess_question_with_fuzzy_matching(q) for q in questions]
+    for question, corrected_question in zip(questions, corrected):
+        if corrected_question != question:
+            print(f"💡 Understood as: {corrected_question}")
+
+    print(f"\nUnderstanding your {len(questions)} questions...")
+    cypher_queries = generate_cypher_queries(corrected)
+    is_cypher = [isinstance(q, str) and bool(_RE_MATCH_KEYWORD.search(q)) for q in cypher_queries]
+    results = iter(execute_cypher_queries([q for q, ok in zip(cypher_queries, is_cypher) if ok]))
+
+    for question, cypher_query, ok in zip(questions, cypher_queries, is_cypher):
+        print(f"\nQuestion: {question}")
+        if ok:
+            print(f"Generated Cypher Query:\n{cypher_query}")
+            print("Chatbot: ", end="", flush=True)
+            _print_reply(explain_result_with_llm, question, next(results))
+        else:
+            print("Chatbot: ", end="", flush=True)
+            _print_reply(normal_chat, question)
 
 
 def main():
     print("Connected to Neo4j database: neo4j!")
     print("Welcome to the Neo4j Chatbot!")
     print("Ask about student relationships or have a casual chat (type 'exit' to quit).")
+    print("Separate several questions with ';' to ask them all at once.")
     print("🔍 Fuzzy search enabled - typos in names will be auto-corrected!\n")
 
     while True:
@@ -390,6 +1148,11 @@ def main():
         if question.lower() == "exit":
             print("Goodbye!")
             break
+
+        questions = [q.strip() for q in question.split(";") if q.strip()]
+        if len(questions) > 1:
+            _answer_batch(questions)
+            continue
         
         # Preprocess the question with fuzzy name matching
         corrected_question = preprocess_question_with_fuzzy_matching(question)
@@ -402,18 +1165,18 @@ def main():
         cypher_query = generate_cypher_query(corrected_question)
 
         # Heuristic: treat the generated text as Cypher if it contains a MATCH keyword (case-insensitive).
-        if isinstance(cypher_query, str) and re.search(r"\bMATCH\b", cypher_query, re.IGNORECASE):
+        if isinstance(cypher_query, str) and _RE_MATCH_KEYWORD.search(cypher_query):
             print(f"\nGenerated Cypher Query:\n{cypher_query}")
             print("\nExecuting query...")
             result = execute_cypher_query(cypher_query)
             # Send the raw results to the LLM (or local analyzer) and print a single conversational reply
-            llm_reply = explain_result_with_llm(question, result)
-            print(f"\nChatbot: {llm_reply}")
+            print("\nChatbot: ", end="", flush=True)
+            _print_reply(explain_result_with_llm, question, result)
         else:
             # Fallback to normal chat when the generator did not produce a Cypher query
             print("\nChatbot: Thinking...")
-            reply = normal_chat(question)
-            print(f"Chatbot: {reply}")
+            print("Chatbot: ", end="", flush=True)
+            _print_reply(normal_chat, question)
 
 
 if __name__ == "__main__":
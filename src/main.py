@@ -1,40 +1,66 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+import asyncio
 import sys
 import os
-import threading
-import subprocess
-import sys as _sys
-import os as _os
 
 # Add fastapi directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../fastapi'))
 
-from routes.student_routes import router
+from routes.student_routes import router, student_service
+
+
+BACKFILL_SCRIPT = os.path.normpath(os.path.join(os.path.dirname(__file__), '../fastapi/services/create_relationships.py'))
+
+
+async def _start_backfill():
+    """
+    Run the relationship backfill script as a child process of the event loop.
+    Set BACKFILL_ON_STARTUP=0 to skip it, e.g. for quick restarts in development.
+    """
+    if os.getenv("BACKFILL_ON_STARTUP", "1") == "0":
+        return None
+    try:
+        return await asyncio.create_subprocess_exec(sys.executable, BACKFILL_SCRIPT)
+    except Exception:
+        return None
+
+
+async def _invalidate_after_backfill(backfill) -> None:
+    # Recommendations cached while the backfill ran miss its SAME_*/NEARBY edges
+    await backfill.wait()
+    student_service.invalidate_recommendations()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await student_service.ensure_schema()
+    backfill = await _start_backfill()
+    watcher = asyncio.create_task(_invalidate_after_backfill(backfill)) if backfill else None
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        # Don't leave a backfill running past shutdown; its MERGEs are safe to rerun.
+        if backfill is not None and backfill.returncode is None:
+            backfill.terminate()
+            await backfill.wait()
+        # Close the driver once, explicitly, rather than leaving it to GC.
+        await student_service.close()
+
 
 app = FastAPI(
     title="Student Onboarding and Recommendation API",
     description="API for student onboarding and people recommendation using Neo4j",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Include routers
 app.include_router(router)
 
 
-
-@app.on_event("startup")
-async def startup_backfill():
-    # Always run backfill on startup
-    def _backfill():
-        script = _os.path.normpath(_os.path.join(_os.path.dirname(__file__), '../fastapi/services/create_relationships.py'))
-        try:
-            subprocess.run([_sys.executable, script], check=False)
-        except Exception:
-            pass
-
-    threading.Thread(target=_backfill, daemon=True).start()
-
-
 @app.get("/")
 async def root():
     return {
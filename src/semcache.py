@@ -0,0 +1,80 @@
+import math
+import threading
+import time
+from operator import mul
+from typing import Callable, Hashable, List, Optional
+
+
+class SemanticCache:
+    """
+    Near-duplicate question cache: returns a stored answer when a new question's
+    embedding is close enough (cosine similarity) to one seen before.
+
+    `embed` maps text to a vector, or None when embedding is unavailable; after
+    a None the cache is skipped for `retry_after` seconds, doubling on each
+    further failure up to `max_retry_after`. A hit also requires an equal
+    `guard`, so questions that only differ in e.g. the student they name never
+    share an answer. Embed a question once with `vector()` and pass the result
+    to both `lookup` and `add`. Lookups and adds are safe to call from
+    several threads.
+    """
+
+    def __init__(self, embed: Callable[[str], Optional[List[float]]],
+                 threshold: float = 0.92, max_entries: int = 2000,
+                 retry_after: float = 30.0, max_retry_after: float = 600.0):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+        self._backoff = retry_after
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._vectors: List[List[float]] = []
+        self._guards: List[Hashable] = []
+        self._answers: List[str] = []
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[List[float]]:
+        norm = math.sqrt(sum(map(mul, vector, vector)))
+        if not norm:
+            return None
+        return [x / norm for x in vector]
+
+    def vector(self, question: str) -> Optional[List[float]]:
+        """Return the question's normalized embedding, or None while backing off."""
+        if time.monotonic() < self._retry_at:
+            return None
+        vector = self.embed(question)
+        if not vector:
+            self._retry_at = time.monotonic() + self._backoff
+            self._backoff = min(self._backoff * 2, self.max_retry_after)
+            return None
+        self._backoff = self.retry_after
+        return self._normalize(vector)
+
+    def lookup(self, vector: Optional[List[float]], guard: Hashable = None) -> Optional[str]:
+        """Return the cached answer for the most similar question, or None."""
+        if vector is None:
+            return None
+
+        with self._lock:
+            best, best_score = None, self.threshold
+            for i, stored in enumerate(self._vectors):
+                if self._guards[i] != guard:
+                    continue
+                score = sum(map(mul, stored, vector))
+                if score > best_score:
+                    best, best_score = i, score
+            return self._answers[best] if best is not None else None
+
+    def add(self, vector: Optional[List[float]], answer: str, guard: Hashable = None) -> None:
+        """Store an answer; the oldest entry is evicted once the cache is full."""
+        if vector is None:
+            return
+        with self._lock:
+            if len(self._vectors) >= self.max_entries:
+                del self._vectors[0], self._guards[0], self._answers[0]
+            self._vectors.append(vector)
+            self._guards.append(guard)
+            self._answers.append(answer)
@@ -0,0 +1,28 @@
+import os
+import sys
+
+# llm_cypher opens a (lazy) Neo4j driver at import time; it needs a URI but no server.
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "neo4j")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src"))
+
+from llm_cypher import MAX_RESULT_ROWS, _with_row_limit
+
+
+def test_limit_added_when_final_return_has_none():
+    query = "MATCH (s:Student) WITH s ORDER BY s.name LIMIT 5 MATCH (s)--(o) RETURN o"
+    assert _with_row_limit(query) == f"{query} LIMIT {MAX_RESULT_ROWS}"
+
+
+def test_final_return_with_limit_is_kept():
+    query = "MATCH (s:Student) RETURN s.name LIMIT 10"
+    assert _with_row_limit(query) == query
+
+
+def test_return_inside_subquery_before_write_gets_no_limit():
+    query = (
+        "MATCH (s:Student) CALL { WITH s MATCH (s)-[:LIKES]->(i) RETURN count(i) AS n } "
+        "SET s.interest_count = n"
+    )
+    assert _with_row_limit(query) == query